@@ -0,0 +1,29 @@
+"""Add items (owner_id, id) index
+
+Revision ID: 3f9c2a7d1b4e
+Revises: 5a1d7c3e9f20
+Create Date: 2026-10-18 10:12:31.418204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2a7d1b4e'
+down_revision: Union[str, None] = '5a1d7c3e9f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    indexes = {index['name'] for index in sa.inspect(op.get_bind()).get_indexes('items')}
+    if 'ix_items_owner_id_id' in indexes:
+        return  # created by init_db
+    op.create_index('ix_items_owner_id_id', 'items', ['owner_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_items_owner_id_id', table_name='items')
@@ -0,0 +1,57 @@
+"""Create items, roles and user_roles
+
+Revision ID: 5a1d7c3e9f20
+Revises: 64317e244acc
+Create Date: 2026-10-19 09:21:07.114392
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a1d7c3e9f20'
+down_revision: Union[str, None] = '64317e244acc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The models gained these tables without a migration; databases built by init_db have them
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    if 'items' not in existing:
+        op.create_table('items',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=True),
+        sa.Column('owner_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_items_id'), 'items', ['id'], unique=False)
+    if 'roles' not in existing:
+        op.create_table('roles',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_roles_id'), 'roles', ['id'], unique=False)
+        op.create_index(op.f('ix_roles_name'), 'roles', ['name'], unique=True)
+    if 'user_roles' not in existing:
+        op.create_table('user_roles',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('role_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['role_id'], ['roles.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'role_id')
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('user_roles')
+    op.drop_index(op.f('ix_roles_name'), table_name='roles')
+    op.drop_index(op.f('ix_roles_id'), table_name='roles')
+    op.drop_table('roles')
+    op.drop_index(op.f('ix_items_id'), table_name='items')
+    op.drop_table('items')
@@ -19,6 +19,9 @@ depends_on: Union[str, Sequence[str], None] = None
 
 
 def upgrade() -> None:
+    # Databases built by init_db (Base.metadata.create_all) already have the table
+    if sa.inspect(op.get_bind()).has_table('users'):
+        return
     # ### commands auto generated by Alembic - please adjust! ###
     op.create_table('users',
     sa.Column('id', sa.Integer(), nullable=False),
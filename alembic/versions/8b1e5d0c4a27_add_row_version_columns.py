@@ -0,0 +1,31 @@
+"""Add row version columns to users and items
+
+Revision ID: 8b1e5d0c4a27
+Revises: 3f9c2a7d1b4e
+Create Date: 2026-10-18 14:03:52.906117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b1e5d0c4a27'
+down_revision: Union[str, None] = '3f9c2a7d1b4e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for table in ('users', 'items'):
+        # Databases built by init_db already have the column
+        if 'version_id' not in {column['name'] for column in inspector.get_columns(table)}:
+            op.add_column(table, sa.Column('version_id', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('items', 'version_id')
+    op.drop_column('users', 'version_id')
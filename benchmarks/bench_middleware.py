@@ -0,0 +1,125 @@
+"""Microbenchmark: per-request cost of each middleware layer, and of the whole stack before and after.
+
+    python benchmarks/bench_middleware.py --requests 5000
+
+Requests are driven straight through the ASGI callable (no client or socket), so the figures
+are the layers' own overhead. "legacy" rows rebuild the stack this project used before the
+pipeline: explicit SentryAsgiMiddleware and the Redis session as an ``@app.middleware("http")``
+(BaseHTTPMiddleware) function. Sentry is not initialised, so its row is a lower bound.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi import FastAPI, Request  # noqa: E402
+from sentry_sdk.integrations.asgi import SentryAsgiMiddleware  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+from src.core.config.config import settings  # noqa: E402
+from src.middleware.pipeline import Layer, install_middleware, layers, skip_middleware  # noqa: E402
+from src.middleware.session import RedisSession  # noqa: E402
+
+
+async def legacy_session(request: Request, call_next):
+    # The Redis session middleware as it was before the pipeline
+    session_id = request.cookies.get(settings.session_cookie_name)
+    session = request.state.session = RedisSession(session_id)
+    response = await call_next(request)
+    if session.loaded:
+        await session.save()
+    return response
+
+
+def build_app(stack):
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.get("/health")
+    @skip_middleware(*(layer.name for layer in stack))
+    async def health():
+        return {"ok": True}
+
+    install_middleware(app, stack)
+    return app
+
+
+def legacy_stack():
+    new = {layer.name: layer for layer in layers()}
+    return [
+        new["metrics"],
+        new["cookie_session"],
+        Layer("legacy_session", BaseHTTPMiddleware, {"dispatch": legacy_session}),
+        new["cors"],
+        Layer("legacy_sentry", SentryAsgiMiddleware),
+    ]
+
+
+async def drive(app, path: str, requests: int):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench"), (b"origin", b"http://localhost:3000"), (b"cookie", b"session_id=abc")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - started) / requests
+
+
+async def run(requests: int, repeat: int):
+    cases = [("bare app", build_app([]), "/ping")]
+    for layer in layers() + legacy_stack()[2:3] + legacy_stack()[4:]:
+        cases.append((f"+ {layer.name}", build_app([layer]), "/ping"))
+    cases.append(("legacy stack", build_app(legacy_stack()), "/ping"))
+    cases.append(("pipeline", build_app(layers()), "/ping"))
+    cases.append(("pipeline, route opted out", build_app(layers()), "/health"))
+
+    best = {}
+    for _, app, path in cases:
+        await drive(app, path, min(requests, 500))  # warm-up, builds the middleware stack
+    # Interleaved, so drift on a busy machine hits every case alike
+    for _ in range(repeat):
+        for label, app, path in cases:
+            cost = await drive(app, path, requests)
+            best[label] = min(cost, best.get(label, cost))
+
+    bare = best["bare app"]
+    return [(label, cost, None if label == "bare app" else cost - bare) for label, cost in best.items()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = asyncio.run(run(args.requests, args.repeat))
+    print(f"{'layer':<30}{'us/request':>12}{'overhead us':>14}")
+    for label, cost, overhead in rows:
+        print(f"{label:<30}{cost * 1e6:>12.1f}{'' if overhead is None else f'{overhead * 1e6:.1f}':>14}")
+
+
+if __name__ == "__main__":
+    main()
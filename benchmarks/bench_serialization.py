@@ -0,0 +1,71 @@
+"""Microbenchmark: rendering a UserModel with a large items list through each response path.
+
+    python benchmarks/bench_serialization.py --items 10 1000 10000
+
+"stdlib" is FastAPI's default (re-validate against response_model, jsonable_encoder,
+json.dumps); "orjson" swaps only the final encoder; "model" is ModelRoute's path, where an
+already-validated model is rendered by pydantic's own serializer.
+"""
+import argparse
+import asyncio
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_model_field  # noqa: E402
+from src.core.responses import ModelJSONResponse  # noqa: E402
+from src.models.pydanticModels import ItemModel, UserModel  # noqa: E402
+
+
+def build_user(items: int):
+    return UserModel(
+        id=1,
+        email="bench@example.com",
+        items=[ItemModel(id=i, name=f"item {i}", owner_id=1) for i in range(items)],
+    )
+
+
+def fastapi_path(loop, response_class, field, user):
+    content = loop.run_until_complete(serialize_response(field=field, response_content=user, is_coroutine=True))
+    return response_class(content).body
+
+
+def run(items: int, repeat: int):
+    user = build_user(items)
+    field = create_model_field(name="response", type_=UserModel, mode="serialization")
+    loop = asyncio.new_event_loop()
+    cases = {
+        "stdlib": lambda: fastapi_path(loop, JSONResponse, field, user),
+        "orjson": lambda: fastapi_path(loop, ORJSONResponse, field, user),
+        "model": lambda: ModelJSONResponse(user).body,
+    }
+    results = {}
+    for name, case in cases.items():
+        number = max(1, 20000 // (items + 1))
+        best = min(timeit.repeat(case, number=number, repeat=repeat)) / number
+        results[name] = best
+    loop.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, nargs="+", default=[10, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'items':>8}{'stdlib ms':>12}{'orjson ms':>12}{'model ms':>12}{'speedup':>10}")
+    for items in args.items:
+        results = run(items, args.repeat)
+        print(
+            f"{items:>8}{results['stdlib'] * 1000:>12.3f}{results['orjson'] * 1000:>12.3f}"
+            f"{results['model'] * 1000:>12.3f}{results['stdlib'] / results['model']:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
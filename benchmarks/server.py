@@ -0,0 +1,32 @@
+"""uvicorn process for ``manage.py bench --mode socket``; Settings come from the parent's environment."""
+import argparse
+from contextlib import asynccontextmanager
+
+import uvicorn
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--redis", choices=["fake", "real"], default="fake")
+    args = parser.parse_args()
+
+    from benchmarks.load import use_fakeredis
+    from src.main import app
+
+    if args.redis == "fake":
+        lifespan = app.router.lifespan_context
+
+        # Runs on uvicorn's loop before the app's lifespan calls redis_conn.initialize()
+        @asynccontextmanager
+        async def with_fakeredis(app):
+            use_fakeredis()
+            async with lifespan(app):
+                yield
+
+        app.router.lifespan_context = with_fakeredis
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,100 @@
 import sys
 import os
+from contextlib import contextmanager
+import pytest
 
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+
+@pytest.fixture
+def assert_query_count():
+    """Fail if the block runs a different number of SQL statements, e.g.
+
+        with assert_query_count(2):
+            client.get("/users/1")
+    """
+    from sqlalchemy import event
+    from src.models.models import async_engine
+
+    @contextmanager
+    def check(expected: int, engine=async_engine.sync_engine):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+        assert len(statements) == expected, (
+            f"Expected {expected} queries, got {len(statements)}:\n" + "\n".join(statements)
+        )
+
+    return check
+
+
+class IsolatedDatabase:
+    """A private in-memory database, so tests never write to the configured DATABASE_URL."""
+
+    def __init__(self):
+        from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+        from sqlalchemy.pool import StaticPool
+
+        # StaticPool: every session shares the one connection that holds the in-memory database
+        self.engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        self.sessions = async_sessionmaker(self.engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+        self._apps = []
+
+    def run(self, scenario):
+        """Run ``scenario(db)`` with a fresh session on this database and return its result."""
+        import asyncio
+
+        async def run():
+            async with self.sessions() as db:
+                return await scenario(db)
+
+        return asyncio.run(run())
+
+    def use_on(self, app):
+        from src.api.v1.utils import get_db
+
+        async def get_isolated_db():
+            async with self.sessions() as db:
+                yield db
+
+        app.dependency_overrides[get_db] = get_isolated_db
+        self._apps.append(app)
+        return app
+
+    def close(self):
+        import asyncio
+        from src.api.v1.utils import get_db
+
+        for app in self._apps:
+            app.dependency_overrides.pop(get_db, None)
+        asyncio.run(self.engine.dispose())
+
+
+@pytest.fixture(scope="module")
+def isolated_db():
+    """Module-wide IsolatedDatabase with the schema created; route apps to it with ``use_on(app)``.
+
+    Streaming exports open their own sessions, so those are pointed at it too.
+    """
+    import asyncio
+    from src.api.v1 import export
+    from src.models.models import Base
+
+    database = IsolatedDatabase()
+
+    async def create_schema():
+        async with database.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    asyncio.run(create_schema())
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(export, "AsyncSessionLocal", database.sessions)
+        yield database
+    database.close()
@@ -4,6 +4,7 @@ from pathlib import Path
 from src.setup import setup_plantuml
 from src.mermaid import install_mermaid_cli
 import platform
+import sys
 import subprocess
 import os
 
@@ -96,6 +97,143 @@ def runserver():
     subprocess.run(["uvicorn", "src.main:app", "--reload"])
 
 
+@app.command()
+def serve(
+    host: str = "0.0.0.0",
+    port: int = 8000,
+    workers: int = typer.Option(None, help="Defaults to SERVER_WORKERS, or one per CPU"),
+    keepalive: int = typer.Option(None, help="Seconds an idle keep-alive connection stays open"),
+    backlog: int = typer.Option(None, help="Pending connections the socket queues"),
+    graceful_timeout: int = typer.Option(None, help="Seconds in-flight requests get to finish on shutdown"),
+    access_log: bool = False,
+    preload: bool = typer.Option(None, help="Import the app once and fork workers from it (needs gunicorn)"),
+):
+    """Run the production server: multiple workers, uvloop and httptools"""
+    from src.core.config.config import settings
+    from src.core.server import default_workers, serve as run_server
+
+    workers = workers or settings.server_workers or default_workers()
+    preload = settings.server_preload if preload is None else preload
+    typer.echo(f"Starting {workers} worker(s) on {host}:{port}{' (preloaded)' if preload else ''}...")
+    try:
+        run_server(
+            host,
+            port,
+            workers,
+            keepalive=keepalive or settings.server_keepalive_seconds,
+            backlog=backlog or settings.server_backlog,
+            graceful_timeout=graceful_timeout or settings.server_graceful_timeout_seconds,
+            access_log=access_log,
+            preload=preload,
+        )
+    except RuntimeError as exc:
+        typer.secho(str(exc), fg="red")
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def profile_startup(module: str = "src.main", top: int = 20):
+    """Report import time per module for the application entry point"""
+    typer.echo(f"Profiling import of {module}...")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        # The traceback's last line, past the importtime lines; a crashed interpreter may print nothing
+        errors = [line for line in result.stderr.splitlines() if line.strip() and not line.startswith("import time:")]
+        detail = f": {errors[-1]}" if errors else ""
+        typer.secho(f"Error: import of {module} exited with code {result.returncode}{detail}", fg="red")
+        raise typer.Exit(code=1)
+
+    # Lines look like "import time:  self [us] | cumulative | imported package"
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings.append((name.strip(), int(self_us), int(cumulative_us)))
+
+    total_ms = sum(self_us for _, self_us, _ in timings) / 1000
+    typer.echo(f"Total import time: {total_ms:.1f} ms across {len(timings)} modules\n")
+
+    project = sorted((t for t in timings if t[0].split(".")[0] == "src"), key=lambda t: t[2], reverse=True)
+    typer.echo(f"{'Project module':<45}{'self ms':>10}{'cumulative ms':>16}")
+    for name, self_us, cumulative_us in project[:top]:
+        typer.echo(f"{name:<45}{self_us / 1000:>10.1f}{cumulative_us / 1000:>16.1f}")
+
+    heaviest = sorted(timings, key=lambda t: t[1], reverse=True)
+    typer.echo(f"\n{'Heaviest module (self time)':<45}{'self ms':>10}{'cumulative ms':>16}")
+    for name, self_us, cumulative_us in heaviest[:top]:
+        typer.echo(f"{name:<45}{self_us / 1000:>10.1f}{cumulative_us / 1000:>16.1f}")
+
+
+@app.command()
+def pin_oauth_metadata(output: str = "oauth_metadata.json"):
+    """Snapshot OAuth provider metadata and JWKS for use as OAUTH_METADATA_PINNED_FILE"""
+    import asyncio
+    import json
+    from src.auth.provider_metadata import provider_metadata
+
+    snapshot = asyncio.run(provider_metadata.snapshot())
+    Path(output).write_text(json.dumps(snapshot, indent=2))
+    typer.echo(f"Pinned metadata for {', '.join(snapshot)} to {output}.")
+    typer.echo(f"Set OAUTH_METADATA_PINNED_FILE={output} to serve it instead of fetching.")
+
+
+@app.command()
+def bench(
+    mode: str = typer.Option("inprocess", help="inprocess (ASGI transport) or socket (real uvicorn server)"),
+    scenario: list[str] = typer.Option(None, help="Scenario to run; repeat for several. Default: all"),
+    concurrency: int = 10,
+    duration: float = 5.0,
+    database_url: str = typer.Option(None, help="Defaults to a fresh SQLite file"),
+    redis: str = typer.Option("fake", help="fake (fakeredis) or real (REDIS_HOST/REDIS_PORT)"),
+    rate_limit: bool = typer.Option(False, help="Keep the rate limiter on while benchmarking"),
+    allocation_requests: int = typer.Option(200, help="Requests per scenario traced for allocations (in-process only)"),
+    port: int = 8765,
+    output: str = typer.Option(None, help="Defaults to benchmarks/results/<commit>.json"),
+    baseline: str = typer.Option(None, help="Earlier results to compare against"),
+    tolerance: float = typer.Option(0.10, help="Allowed RPS drop / p95 growth before failing"),
+):
+    """Load-test the main endpoints and save RPS, latency percentiles and allocations as JSON"""
+    import asyncio
+    import json
+    from benchmarks import load
+
+    # Settings are read on import, so the environment is set before anything from src/ loads
+    url = load.configure_environment(database_url, rate_limit=rate_limit)
+    names = scenario or list(load.SCENARIOS)
+    unknown = set(names) - set(load.SCENARIOS)
+    if unknown:
+        typer.secho(f"Unknown scenario(s): {', '.join(sorted(unknown))}", fg="red")
+        raise typer.Exit(code=2)
+
+    typer.echo(f"Benchmarking {', '.join(names)} ({mode}, {concurrency} clients, {duration}s each)...")
+    if mode == "inprocess":
+        results = asyncio.run(load.run_inprocess(names, concurrency, duration, redis, allocation_requests))
+    elif mode == "socket":
+        results = asyncio.run(load.run_socket(names, concurrency, duration, redis, port))
+    else:
+        typer.secho(f"Unknown mode: {mode}", fg="red")
+        raise typer.Exit(code=2)
+
+    report = {"meta": load.metadata(mode, url, redis, concurrency, duration), "results": results}
+    typer.echo(load.format_table(results))
+    path = Path(output) if output else load.RESULTS_DIR / f"{report['meta']['commit'] or 'results'}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2))
+    typer.echo(f"Results written to {path}")
+
+    if baseline:
+        regressions = load.compare(report, json.loads(Path(baseline).read_text()), tolerance)
+        if regressions:
+            typer.secho("Regressions against baseline:\n  " + "\n  ".join(regressions), fg="red")
+            raise typer.Exit(code=1)
+        typer.secho(f"No regressions against {baseline} (tolerance {tolerance:.0%})", fg="green")
+
+
 @app.command()
 def create_endpoint(name: str):
     """Generate a new FastAPI endpoint"""
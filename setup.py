@@ -10,12 +10,13 @@ setup(
     packages=find_packages(),
     install_requires=[
         "aiocache==0.12.3",
-        "aioredis==1.3.1",
+        "aiosqlite==0.20.0",
         "alembic==1.13.3",
         "annotated-types==0.7.0",
         "anyio==4.6.0",
         "asgiref==3.8.1",
         "async-timeout==4.0.3",
+        "asyncpg==0.29.0",
         "Authlib==1.3.2",
         "backoff==2.2.1",
         "bcrypt==3.2.0",
@@ -32,7 +33,6 @@ setup(
         "eralchemy==1.5.0",
         "fastapi==0.115.0",
         "fastapi-cli==0.0.5",
-        "fastapi-limiter==0.1.6",
         "googleapis-common-protos==1.65.0",
         "greenlet==3.1.1",
         "grpcio==1.66.2",
@@ -69,6 +69,7 @@ setup(
         "packaging==24.1",
         "passlib==1.7.4",
         "pluggy==1.5.0",
+        "prometheus-client==0.26.0",
         "protobuf==4.25.5",
         "psycopg2-binary==2.9.9",
         "pyasn1==0.6.1",
@@ -93,7 +94,6 @@ setup(
         "setuptools==75.1.0",
         "shellingham==1.5.4",
         "six==1.16.0",
-        "slowapi==0.1.9",
         "sniffio==1.3.1",
         "SQLAlchemy==2.0.35",
         "starlette==0.38.6",
@@ -102,6 +102,7 @@ setup(
         "ujson==5.10.0",
         "urllib3==2.2.3",
         "uvicorn==0.31.0",
+        "uvloop==0.23.0; sys_platform != 'win32'",
         "watchfiles==0.24.0",
         "websockets==13.1",
         "wrapt==1.16.0",
@@ -121,5 +122,16 @@ setup(
         "Programming Language :: Python :: 3",
         "Operating System :: OS Independent",
     ],
+    extras_require={
+        # Outbound calls use HTTP/2 when h2 is installed
+        "http2": ["h2>=4,<5"],
+        # Database and Redis spans; requests are traced without them
+        "tracing": [
+            "opentelemetry-instrumentation-sqlalchemy==0.48b0",
+            "opentelemetry-instrumentation-redis==0.48b0",
+        ],
+        # manage.py serve --preload forks workers from one imported app
+        "preload": ["gunicorn>=22,<24"],
+    },
     python_requires=">=3.9",
 )
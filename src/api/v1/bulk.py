@@ -0,0 +1,103 @@
+import logging
+import time
+import orjson
+from fastapi import HTTPException, Request
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson")
+
+
+def bulk_openapi(schema):
+    """Request body docs for endpoints that read the body themselves."""
+    array = {"type": "array", "items": schema.model_json_schema()}
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": array},
+                "application/x-ndjson": {"schema": schema.model_json_schema()},
+            },
+        }
+    }
+
+
+async def iter_bulk_rows(request: Request):
+    """Yield rows from a JSON array body, or raw lines from an NDJSON stream as they arrive."""
+    if request.headers.get("content-type", "").startswith(NDJSON_TYPES):
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield line
+        if buffer.strip():
+            yield buffer
+        return
+
+    try:
+        rows = orjson.loads(await request.body())
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=422, detail="Expected a JSON array")
+    for row in rows:
+        yield row
+
+
+async def _insert_chunk(db, model, chunk, results):
+    # insertmanyvalues batches the chunk into multi-row INSERT ... RETURNING statements
+    statement = insert(model).returning(model.id, sort_by_parameter_order=True)
+    try:
+        result = await db.execute(statement, [values for _, values in chunk])
+        ids = result.scalars().all()
+        await db.commit()
+    except SQLAlchemyError as exc:
+        await db.rollback()
+        first, last = chunk[0][0], chunk[-1][0]
+        # The driver message can carry other rows' values and schema details; it stays in the log
+        logging.warning(
+            "Bulk insert into %s rejected rows %s-%s: %s", model.__tablename__, first, last, getattr(exc, "orig", None) or exc
+        )
+        error = f"Rows {first}-{last} were rejected by the database"
+        results.extend({"index": index, "error": error} for index, _ in chunk)
+        return 0
+    results.extend({"index": index, "id": row_id} for (index, _), row_id in zip(chunk, ids))
+    return len(ids)
+
+
+async def bulk_insert(db, model, schema, rows, to_values, chunk_size: int):
+    """Validate each row with `schema` and insert the valid ones `chunk_size` at a time.
+
+    Returns per-row results in input order: {"index", "id"} for inserted rows and
+    {"index", "error"} for rows that failed validation or whose chunk was rejected.
+    """
+    started = time.perf_counter()
+    results, chunk, inserted, index = [], [], 0, 0
+    async for row in rows:
+        try:
+            if isinstance(row, bytes):
+                row = orjson.loads(row)
+            chunk.append((index, to_values(schema.model_validate(row))))
+        except orjson.JSONDecodeError as exc:
+            results.append({"index": index, "error": f"Invalid JSON: {exc}"})
+        except ValidationError as exc:
+            results.append({"index": index, "error": exc.errors(include_url=False, include_context=False)})
+        index += 1
+        if len(chunk) >= chunk_size:
+            inserted += await _insert_chunk(db, model, chunk, results)
+            chunk = []
+    if chunk:
+        inserted += await _insert_chunk(db, model, chunk, results)
+
+    elapsed = time.perf_counter() - started
+    results.sort(key=lambda result: result["index"])
+    return {
+        "inserted": inserted,
+        "failed": index - inserted,
+        "seconds": round(elapsed, 4),
+        "rows_per_second": round(inserted / elapsed, 1) if elapsed else None,
+        "results": results,
+    }
@@ -0,0 +1,99 @@
+import hashlib
+from typing import Optional
+from fastapi import Depends, HTTPException, Query, Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.api.v1.utils import get_db
+from src.core.config.config import settings
+from src.core.response_cache import response_cache
+from src.models.models import Item, User
+
+
+def make_etag(*parts):
+    # Weak: derived from row versions rather than the exact bytes sent
+    return 'W/"{}"'.format(hashlib.sha1(":".join(map(str, parts)).encode()).hexdigest())
+
+
+def etag_matches(if_none_match: str, etag: str):
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def conditional(compute_etag):
+    """Route dependency answering If-None-Match with 304 before the handler runs.
+
+    ``compute_etag`` is itself a dependency (so it receives validated path params) returning the
+    resource's ETag, or None when it does not exist so the handler can produce its own 404.
+    """
+
+    async def check_etag(request: Request, response: Response, etag: str = Depends(compute_etag)):
+        if etag is None:
+            return
+        if etag_matches(request.headers.get("If-None-Match"), etag):
+            raise HTTPException(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+
+    return Depends(check_etag)
+
+
+async def user_etag(user_id: int, db: AsyncSession = Depends(get_db)):
+    """ETag for a user and its items, from one aggregate over the version columns."""
+
+    async def load():
+        result = await db.execute(
+            select(
+                User.version_id,
+                func.count(Item.id),
+                func.coalesce(func.sum(Item.id), 0),
+                func.coalesce(func.sum(Item.version_id), 0),
+            )
+            .outerjoin(Item, Item.owner_id == User.id)
+            .where(User.id == user_id)
+            .group_by(User.id, User.version_id)
+        )
+        row = result.one_or_none()
+        return make_etag("user", user_id, *row) if row is not None else None
+
+    # Shares the user's invalidation tag with the cached body
+    return await response_cache.get_or_load(f"cache:etag:users:{user_id}", load, tags=[f"user:{user_id}"])
+
+
+def _page_rows(id_column, version_column, filters, after, limit):
+    # The rows keyset_page reads, including the look-ahead row that decides next_cursor
+    query = select(id_column.label("id"), version_column.label("version")).where(*filters)
+    if after is not None:
+        query = query.where(id_column > after)
+    return query.order_by(id_column).limit(limit + 1)
+
+
+async def items_page_etag(
+    after: Optional[int] = None,
+    limit: int = Query(settings.page_size_default, ge=1, le=settings.page_size_max),
+    owner_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """ETag for one page of /items: a digest of its rows' (id, version) pairs, in order."""
+    filters = [Item.owner_id == owner_id] if owner_id is not None else []
+    rows = (await db.execute(_page_rows(Item.id, Item.version_id, filters, after, limit))).all()
+    return make_etag("items", owner_id, after, limit, *(f"{row_id}.{version}" for row_id, version in rows))
+
+
+async def users_page_etag(
+    after: Optional[int] = None,
+    limit: int = Query(settings.page_size_default, ge=1, le=settings.page_size_max),
+    email: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """ETag for one page of /users: its users' (id, version) pairs plus those of their embedded items."""
+    filters = [User.email == email] if email is not None else []
+    page = _page_rows(User.id, User.version_id, filters, after, limit).subquery()
+    rows = await db.execute(
+        select(page.c.id, page.c.version, Item.id, Item.version_id)
+        .outerjoin(Item, Item.owner_id == page.c.id)
+        .order_by(page.c.id, Item.id)
+    )
+    return make_etag("users", email, after, limit, *(".".join(map(str, row)) for row in rows))
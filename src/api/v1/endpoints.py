@@ -1,136 +1,189 @@
 from fastapi import APIRouter
-from src.auth.auth import create_access_token, verify_password, get_password_hash
+from src.auth.auth import create_access_token
 from src.models.models import User, Item
-from src.models.pydanticModels import ItemModel, UserModel
+from src.models.pydanticModels import ItemModel, UserModel, Page
 from datetime import timedelta
-from src.auth.auth import has_role
-import jwt
 from fastapi import Depends
-from fastapi.security import OAuth2PasswordBearer
 from fastapi import APIRouter
 from fastapi import APIRouter, HTTPException
 from ...app import app
 from src.core.config.config import settings 
-from fastapi import Request
+from fastapi import Request, Query, Response
+from typing import Literal, Optional
+from fastapi.responses import StreamingResponse
 from src.auth.oauth2 import oauth
-from src.middleware.role import role_required
-from src.redis import redis_conn
-import json
+from src.auth.provider_metadata import provider_metadata
+from src.core.http_client import http_client, fetch_userinfo
+from src.middleware.role import require_role
+from src.middleware.session import oauth_state_store, session_sweeper
 import uuid
-from sqlalchemy.orm import Session
-from src.api.v1.utils import get_db, to_pydantic
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.api.v1.utils import get_db, keyset_page, to_pydantic
+from src.api.v1.bulk import bulk_insert, bulk_openapi, iter_bulk_rows
+from src.api.v1.export import MEDIA_TYPES, stream_export
+from src.api.v1.conditional import conditional, items_page_etag, user_etag, users_page_etag
+from src.models.pool_stats import pool_stats
+from src.core.response_cache import cached, response_cache
+from src.core.responses import ModelRoute
+from src.models.loaders import loader_options
 from src.forms.login import LoginForm
+from src.repositories.users import UserRepository, get_user_repository
 
 
 
-router = APIRouter()
+router = APIRouter(route_class=ModelRoute)
 app.include_router(router, prefix="/api/v1")
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/login")
 
 
 
 @app.post("/items/", response_model=ItemModel)
-async def create_item(item: ItemModel, db: Session = Depends(get_db)):
+async def create_item(item: ItemModel, db: AsyncSession = Depends(get_db)):
     db_item = Item(name=item.name, owner_id=item.owner_id)
     db.add(db_item)
-    db.commit()
-    db.refresh(db_item)
+    await db.commit()
+    await response_cache.invalidate(f"user:{db_item.owner_id}")
     return db_item
 
 @app.post("/users/", response_model=UserModel)
-def create_user(email: str, db: Session = Depends(get_db)):
-    new_user = User(email=email, hashed_password="hashed_pw")
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    return new_user
-
-@app.get("/users/{user_id}", response_model=UserModel)
-def get_user(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
+async def create_user(email: str, users: UserRepository = Depends(get_user_repository)):
+    user = await users.create(email=email, hashed_password="hashed_pw")
+    await response_cache.invalidate(f"user:{user.id}")
+    return user
+
+@app.post("/items/bulk", openapi_extra=bulk_openapi(ItemModel))
+async def create_items_bulk(request: Request, db: AsyncSession = Depends(get_db)):
+    owners = set()
+
+    def to_values(item):
+        owners.add(item.owner_id)
+        return {"name": item.name, "owner_id": item.owner_id}
+
+    summary = await bulk_insert(
+        db, Item, ItemModel, iter_bulk_rows(request), to_values,
+        chunk_size=settings.bulk_insert_chunk_size,
+    )
+    await response_cache.invalidate(*(f"user:{owner_id}" for owner_id in owners))
+    return summary
+
+@app.post("/users/bulk", openapi_extra=bulk_openapi(UserModel))
+async def create_users_bulk(request: Request, db: AsyncSession = Depends(get_db)):
+    return await bulk_insert(
+        db, User, UserModel, iter_bulk_rows(request),
+        lambda user: {"email": user.email, "hashed_password": "hashed_pw"},
+        chunk_size=settings.bulk_insert_chunk_size,
+    )
+
+@app.get("/users/{user_id}", response_model=UserModel, dependencies=[conditional(user_etag)])
+@cached("users", model=UserModel, tags=lambda params: [f"user:{params['user_id']}"], vary_on=None)
+async def get_user(user_id: int, db: AsyncSession = Depends(get_db)):
+    result = await db.execute(
+        select(User).options(*loader_options(User, UserModel)).where(User.id == user_id)
+    )
+    user = result.scalar_one_or_none()
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
-fake_users_db = {
-    "user1": {
-        "username": "user1",
-        "email": "user1@example.com",
-        "password": get_password_hash("password1"),
-        "is_active": True,
-        "is_admin": False,
-        "roles": ["user"]
-    }
-}
-
-def authenticate_user(username: str, password: str):
-    user = fake_users_db.get(username)
-    if not user or not verify_password(password, user["password"]):
-        return False
-    return user
+# Emails are personal data and the filter would confirm which accounts exist, so admins only.
+# The role check comes first, so nobody else learns anything from a 304 either.
+@router.get(
+    "/users",
+    response_model=Page[UserModel],
+    dependencies=[Depends(require_role("admin")), conditional(users_page_etag)],
+)
+async def list_users(
+    after: Optional[int] = None,
+    limit: int = Query(settings.page_size_default, ge=1, le=settings.page_size_max),
+    email: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    query = select(User).options(*loader_options(User, UserModel))
+    if email is not None:
+        query = query.where(User.email == email)
+    return Page[UserModel].model_validate(await keyset_page(db, query, User.id, after, limit))
+
+
+@router.get("/items", response_model=Page[ItemModel], dependencies=[conditional(items_page_etag)])
+async def list_items(
+    after: Optional[int] = None,
+    limit: int = Query(settings.page_size_default, ge=1, le=settings.page_size_max),
+    owner_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    query = select(Item)
+    if owner_id is not None:
+        query = query.where(Item.owner_id == owner_id)
+    return Page[ItemModel].model_validate(await keyset_page(db, query, Item.id, after, limit))
+
+
+@router.get("/export/{table}", dependencies=[Depends(require_role("admin"))])
+async def export_table(
+    table: Literal["users", "items", "user_roles"],
+    format: Literal["ndjson", "csv"] = "ndjson",
+):
+    return StreamingResponse(
+        stream_export(table, format, settings.export_batch_size),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{table}.{format}"'},
+    )
+
 
 @router.post("/login")
-async def login_for_access_token(form_data: LoginForm): 
-    user = authenticate_user(form_data.username, form_data.password)
+async def login_for_access_token(form_data: LoginForm, users: UserRepository = Depends(get_user_repository)): 
+    user = await users.authenticate(form_data.username, form_data.password)
     if not user:
         raise HTTPException(status_code=401, detail="Incorrect username or password")
     
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(data={"sub": user["username"]}, expires_delta=access_token_expires)
+    # Roles travel in the token so role checks never need the database
+    access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
+    access_token = create_access_token(data={"sub": user.email, "roles": user.roles}, expires_delta=access_token_expires)
     
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 @router.get("/admin-dashboard")
-async def admin_dashboard(token: str = Depends(oauth2_scheme)):
-    try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        username = payload.get("sub")
-        if username is None:
-            raise HTTPException(status_code=403, detail="Invalid token")
-    except:
-        raise HTTPException(status_code=403, detail="Invalid token")
-
-    if not has_role(payload, "admin"):
-        raise HTTPException(status_code=403, detail="Admin access required")
-
+async def admin_dashboard(user: dict = Depends(require_role("admin"))):
     return {"admin_data": "secret_admin_data"}
 
 
 @router.get("/login/google")
 async def login_via_google(request: Request):
-    redis = await redis_conn.get_redis()
-
     # Programmatically generate a unique state and session ID
     state = str(uuid.uuid4())
     nonce = str(uuid.uuid4())  # Generate a nonce for validating the ID token
-    session_id = str(uuid.uuid4())
+    state_id = oauth_state_store.new_id()
 
-    # Store the state and nonce in Redis with session_id as the key
-    await redis.set(f"session:{session_id}", json.dumps({'state': state, 'nonce': nonce}))
+    # Store the state and nonce until the callback consumes them (or they expire)
+    await oauth_state_store.set(state_id, {'state': state, 'nonce': nonce})
 
-    # Set the session_id as a cookie in the response
+    # Set the state id as a cookie in the response
     redirect_uri = request.url_for("auth_via_google")
+    await provider_metadata.get("google")  # installs cached metadata so Authlib doesn't fetch it
     response = await oauth.google.authorize_redirect(request, redirect_uri, state=state, nonce=nonce)
-    response.set_cookie(key="session_id", value=session_id)  # Set session_id in cookies
+    response.set_cookie(
+        key=settings.oauth_state_cookie_name,
+        value=state_id,
+        max_age=settings.oauth_state_ttl_seconds,
+        httponly=True,
+        samesite="lax",
+    )
     return response
 
 
 @router.get("/auth/google")
-async def auth_via_google(request: Request):
-    redis = await redis_conn.get_redis()
-
-    # Retrieve session_id from the cookies
-    session_id = request.cookies.get("session_id")
-    if not session_id:
+async def auth_via_google(request: Request, response: Response):
+    # Retrieve the state id from the cookies
+    state_id = request.cookies.get(settings.oauth_state_cookie_name)
+    if not state_id:
         raise HTTPException(status_code=400, detail="Session ID is missing")
 
-    # Retrieve the stored session from Redis
-    session_data = await redis.get(f"session:{session_id}")
-    if not session_data:
+    # Single use: the stored state is deleted as it is read, so a callback cannot be replayed
+    session = await oauth_state_store.pop(state_id)
+    response.delete_cookie(settings.oauth_state_cookie_name)
+    if not session:
         raise HTTPException(status_code=400, detail="Session expired or state missing")
-    
-    session = json.loads(session_data)
+
     stored_state = session.get('state')
     stored_nonce = session.get('nonce')  # Get the stored nonce
     received_state = request.query_params.get("state")
@@ -140,6 +193,7 @@ async def auth_via_google(request: Request):
         raise HTTPException(status_code=400, detail="Mismatching state")
     
     # Complete OAuth2 flow and get the token
+    await provider_metadata.get("google")
     token = await oauth.google.authorize_access_token(request)
     
     # Validate the ID token and nonce
@@ -161,9 +215,24 @@ async def auth_via_google(request: Request):
     return {"token": token, "user": token.get("userinfo")}
 
 
-@router.get("/admin-dashboard", dependencies=[Depends(role_required("admin"))])
-async def admin_dashboard():
-    return {"message": "Admin-only content"}
+@router.get("/admin/db-pool", dependencies=[Depends(require_role("admin"))])
+async def db_pool_status():
+    return pool_stats.snapshot()
+
+
+@router.get("/admin/response-cache", dependencies=[Depends(require_role("admin"))])
+async def response_cache_status():
+    return response_cache.stats()
+
+
+@router.get("/admin/sessions", dependencies=[Depends(require_role("admin"))])
+async def session_store_status():
+    return session_sweeper.stats
+
+
+@router.get("/admin/http-client", dependencies=[Depends(require_role("admin"))])
+async def http_client_status():
+    return http_client.stats()
 
 
 @router.get("/login/github")
@@ -175,8 +244,7 @@ async def login_via_github(request: Request):
 @router.get("/auth/github")
 async def auth_via_github(request: Request):
     token = await oauth.github.authorize_access_token(request)
-    user_info = await oauth.github.get(settings.github_userinfo_url, token=token)
-    return {"user": user_info.json()}
+    return {"user": await fetch_userinfo("github", settings.github_userinfo_url, token)}
 
 
 @router.get("/login/facebook")
@@ -188,5 +256,4 @@ async def login_via_facebook(request: Request):
 @router.get("/auth/facebook")
 async def auth_via_facebook(request: Request):
     token = await oauth.facebook.authorize_access_token(request)
-    user_info = await oauth.facebook.get(settings.facebook_userinfo_url, token=token)
-    return {"user": user_info.json()}
+    return {"user": await fetch_userinfo("facebook", settings.facebook_userinfo_url, token)}
@@ -0,0 +1,42 @@
+import csv
+import io
+import orjson
+from sqlalchemy import select
+from src.models.models import AsyncSessionLocal, Item, Role, User, user_roles
+
+# Exportable tables; password hashes are deliberately left out
+EXPORTS = {
+    "users": select(User.id, User.email).order_by(User.id),
+    "items": select(Item.id, Item.name, Item.owner_id).order_by(Item.id),
+    "user_roles": (
+        select(user_roles.c.user_id, User.email, user_roles.c.role_id, Role.name.label("role"))
+        .join(User, User.id == user_roles.c.user_id)
+        .join(Role, Role.id == user_roles.c.role_id)
+        .order_by(user_roles.c.user_id, user_roles.c.role_id)
+    ),
+}
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _encode_ndjson(columns, rows):
+    return b"".join(orjson.dumps(dict(zip(columns, row))) + b"\n" for row in rows)
+
+
+def _encode_csv(rows):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode()
+
+
+async def stream_export(table: str, fmt: str, batch_size: int):
+    """Yield an encoded export of `table` one batch at a time from a server-side cursor."""
+    # The session lives inside the generator: yield dependencies are torn down
+    # before a StreamingResponse body is sent
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(EXPORTS[table].execution_options(yield_per=batch_size))
+        columns = list(result.keys())
+        if fmt == "csv":
+            yield _encode_csv([columns])
+        async for rows in result.partitions():
+            yield _encode_ndjson(columns, rows) if fmt == "ndjson" else _encode_csv(rows)
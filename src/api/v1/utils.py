@@ -1,12 +1,24 @@
-from src.models.models import SessionLocal
+from src.models.models import AsyncSessionLocal
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    # The session checks a connection out lazily, so requests answered from cache never touch the pool
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
         
         
+async def keyset_page(db, query, id_column, after=None, limit=50):
+    """Run `query` as one keyset page: rows with id > after, in id order, plus the next cursor."""
+    if after is not None:
+        query = query.where(id_column > after)
+    # One extra row tells us whether another page exists
+    result = await db.execute(query.order_by(id_column).limit(limit + 1))
+    rows = result.scalars().all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1].id
+    return {"items": rows, "next_cursor": next_cursor}
+
+
 def to_pydantic(db_obj, pydantic_model):
     return pydantic_model.from_orm(db_obj)
@@ -1,10 +1,19 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from src.core.config.config import settings 
+from src.core.metrics import meter
 
 # Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min_rounds makes needs_update() flag hashes made with a lower work factor
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.bcrypt_rounds,
+    bcrypt__min_rounds=settings.bcrypt_rounds,
+)
 
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
@@ -12,12 +21,66 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+def verify_and_update_password(plain_password, hashed_password):
+    """Return (valid, new_hash); new_hash is set when the stored hash needs upgrading."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+# bcrypt is CPU bound, so the async variants below run it off the event loop
+_hash_executor = None
+_hash_semaphore = None
+hash_queue_depth = 0
+_queue_depth_counter = meter.create_up_down_counter(
+    "auth.password_hash.queue_depth",
+    description="Password hash jobs waiting for or running on the worker pool",
+)
+
+def _get_hash_executor():
+    global _hash_executor
+    if _hash_executor is None:
+        if settings.password_hash_executor == "process":
+            _hash_executor = ProcessPoolExecutor(max_workers=settings.password_hash_workers)
+        else:
+            _hash_executor = ThreadPoolExecutor(
+                max_workers=settings.password_hash_workers,
+                thread_name_prefix="password-hash",
+            )
+    return _hash_executor
+
+async def _run_hash_job(func, *args):
+    global _hash_semaphore, hash_queue_depth
+    if _hash_semaphore is None:
+        _hash_semaphore = asyncio.Semaphore(settings.password_hash_max_concurrency)
+    hash_queue_depth += 1
+    _queue_depth_counter.add(1)
+    try:
+        async with _hash_semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(_get_hash_executor(), func, *args)
+    finally:
+        hash_queue_depth -= 1
+        _queue_depth_counter.add(-1)
+
+async def verify_password_async(plain_password, hashed_password):
+    return await _run_hash_job(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password):
+    return await _run_hash_job(get_password_hash, password)
+
+async def verify_and_update_password_async(plain_password, hashed_password):
+    return await _run_hash_job(verify_and_update_password, plain_password, hashed_password)
+
+def shutdown_hash_executor():
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
+
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
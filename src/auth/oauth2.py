@@ -1,13 +1,15 @@
 from authlib.integrations.starlette_client import OAuth
 from src.core.config.config import settings
+from src.core.http_client import http_client
 
 oauth = OAuth()
 oauth.register(
     client_id=settings.google_client_id,
     client_secret=settings.google_client_secret,
     name="google",
-    server_metadata_url="https://accounts.google.com/.well-known/openid-configuration",
-    client_kwargs={"scope": "openid email profile"},
+    server_metadata_url=settings.google_metadata_url,
+    # Token exchange and discovery go through the app's shared connection pool
+    client_kwargs={"scope": "openid email profile", "transport": http_client.transport_for("google")},
 )
 
 oauth.register(
@@ -16,7 +18,7 @@ oauth.register(
     client_secret=settings.github_client_secret,
     authorize_url=settings.github_authorize_url,
     access_token_url=settings.github_token_url,
-    client_kwargs={'scope': 'read:user'}
+    client_kwargs={'scope': 'read:user', 'transport': http_client.transport_for('github')}
 )
 
 oauth.register(
@@ -25,5 +27,5 @@ oauth.register(
     client_secret=settings.facebook_client_secret,
     authorize_url=settings.facebook_authorize_url,
     access_token_url=settings.facebook_token_url,
-    client_kwargs={'scope': 'email'}
+    client_kwargs={'scope': 'email', 'transport': http_client.transport_for('facebook')}
 )
@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import re
+import time
+import orjson
+from email.utils import parsedate_to_datetime
+from fastapi import HTTPException
+from redis.exceptions import RedisError
+from src.auth.oauth2 import oauth
+from src.core.config.config import settings
+from src.redis_client import redis_conn
+
+# Refresh once this share of an entry's TTL has passed, well before callers see it expire
+REFRESH_AT = 0.8
+# Redis keeps entries this many TTLs, so a failed refresh still has something to serve
+STALE_FACTOR = 2
+
+
+def cache_ttl(headers, default: int):
+    """Seconds a response may be cached for, from Cache-Control max-age or Expires."""
+    cache_control = headers.get("cache-control", "")
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        return settings.oauth_metadata_min_ttl_seconds
+    match = re.search(r"max-age=(\d+)", cache_control)
+    if match:
+        ttl = int(match.group(1)) - int(headers.get("age", 0) or 0)
+    elif headers.get("expires"):
+        try:
+            ttl = int(parsedate_to_datetime(headers["expires"]).timestamp() - time.time())
+        except (TypeError, ValueError):
+            ttl = default
+    else:
+        ttl = default
+    return max(settings.oauth_metadata_min_ttl_seconds, min(ttl, settings.oauth_metadata_max_ttl_seconds))
+
+
+class ProviderMetadataCache:
+    """OIDC discovery documents plus their JWKS, shared by every worker through Redis.
+
+    ``metadata_urls`` maps each provider with a discovery document to its URL. Entries are
+    installed into the Authlib clients so ``authorize_access_token`` and ``parse_id_token``
+    never fetch them on a request. A background task refreshes each entry before it expires;
+    only one worker fetches, the rest pick the result up from Redis.
+    """
+
+    def __init__(self, oauth, metadata_urls: dict, pinned_file: str = None):
+        self.oauth = oauth
+        self.metadata_urls = metadata_urls
+        self.pinned_file = pinned_file
+        self._entries = {}
+        self._task = None
+
+    @property
+    def providers(self):
+        return list(self.metadata_urls)
+
+    async def get(self, name: str):
+        entry = self._entries.get(name)
+        if entry is not None and time.time() < entry["expires_at"]:
+            return entry["metadata"]
+        return self._install(name, await self._load(name, stale=entry))
+
+    async def _load(self, name: str, stale=None):
+        if self.pinned_file:
+            with open(self.pinned_file, "rb") as f:
+                return {"metadata": orjson.loads(f.read())[name], "ttl": float("inf"), "expires_at": float("inf")}
+
+        shared = await self._redis_call("get", _cache_key(name))
+        if shared:
+            shared = orjson.loads(shared)
+            if time.time() < shared["expires_at"]:
+                return shared
+        try:
+            return await self._refresh(name)
+        except Exception as exc:
+            # Serve what we had rather than fail logins while the provider is unreachable
+            fallback = shared or stale
+            if fallback is None:
+                raise
+            logging.warning("Refreshing %s metadata failed, serving stale copy: %s", name, exc)
+            return fallback
+
+    async def refresh(self, name: str):
+        """Fetch the discovery document and JWKS, publish them to every worker and install them."""
+        entry = await self._refresh(name)
+        self._install(name, entry)
+        return entry
+
+    async def _refresh(self, name: str):
+        locked = await self._acquire_refresh(name)
+        if not locked:
+            # Another worker is fetching; use its result if it lands in time
+            for _ in range(20):
+                await asyncio.sleep(0.1)
+                shared = await self._redis_call("get", _cache_key(name))
+                if shared and time.time() < orjson.loads(shared)["expires_at"]:
+                    return orjson.loads(shared)
+
+        try:
+            entry = await self._fetch(name)
+        finally:
+            if locked:
+                await self._redis_call("delete", _lock_key(name))
+        await self._redis_call("set", _cache_key(name), orjson.dumps(entry), ex=entry["ttl"] * STALE_FACTOR)
+        return entry
+
+    async def _fetch(self, name: str):
+        # Authlib's own client class, so provider-specific client_kwargs (proxies, transport) apply
+        client = self.oauth.create_client(name)
+        async with client.client_cls(**client.client_kwargs) as http:
+            response = await http.request("GET", self.metadata_urls[name], withhold_token=True)
+            response.raise_for_status()
+            metadata = response.json()
+            ttl = cache_ttl(response.headers, settings.oauth_metadata_ttl_seconds)
+            if metadata.get("jwks_uri"):
+                response = await http.request("GET", metadata["jwks_uri"], withhold_token=True)
+                response.raise_for_status()
+                metadata["jwks"] = response.json()
+                ttl = min(ttl, cache_ttl(response.headers, settings.oauth_metadata_ttl_seconds))
+        return {"metadata": metadata, "ttl": ttl, "expires_at": time.time() + ttl}
+
+    async def snapshot(self):
+        """Freshly fetched metadata for every provider, in the pinned-file format."""
+        return {name: (await self._fetch(name))["metadata"] for name in self.providers}
+
+    async def _acquire_refresh(self, name: str):
+        # Without Redis every worker fetches for itself
+        try:
+            redis = await redis_conn.get_redis()
+            return bool(await redis.set(_lock_key(name), "1", nx=True, ex=30))
+        except (RedisError, HTTPException):
+            return True
+
+    def _install(self, name: str, entry: dict):
+        self._entries[name] = entry
+        # "_loaded_at" tells Authlib the document is already loaded; "jwks" stops it fetching keys
+        client = self.oauth.create_client(name)
+        client.server_metadata.update(entry["metadata"], _loaded_at=time.time())
+        return entry["metadata"]
+
+    async def run(self):
+        while True:
+            for name in self.providers:
+                entry = self._entries.get(name)
+                if entry is None or time.time() >= _refresh_at(entry):
+                    try:
+                        await self.refresh(name)
+                    except Exception as exc:
+                        logging.warning("Background refresh of %s metadata failed: %s", name, exc)
+            await asyncio.sleep(self._next_wakeup())
+
+    def _next_wakeup(self):
+        pending = [_refresh_at(entry) - time.time() for entry in self._entries.values()]
+        # Bounded below so a provider that keeps failing is not retried in a tight loop
+        return max(5, min([settings.oauth_metadata_min_ttl_seconds, *pending]))
+
+    async def start(self):
+        """Load every provider up front, then keep them fresh in the background."""
+        for name in self.providers:
+            try:
+                await self.get(name)
+            except Exception as exc:
+                # Authlib still fetches lazily on first use
+                logging.warning("Prefetching %s metadata failed: %s", name, exc)
+        if self._task is None and not self.pinned_file:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _redis_call(self, command: str, *args, **kwargs):
+        try:
+            redis = await redis_conn.get_redis()
+            return await getattr(redis, command)(*args, **kwargs)
+        except (RedisError, HTTPException) as exc:
+            logging.warning("Provider metadata cache %s failed: %s", command, exc)
+            return None
+
+
+def _cache_key(name: str):
+    return f"oauth:metadata:{name}"
+
+
+def _lock_key(name: str):
+    return f"oauth:metadata:{name}:lock"
+
+
+def _refresh_at(entry):
+    return entry["expires_at"] - (1 - REFRESH_AT) * entry["ttl"]
+
+
+# Providers registered in src.auth.oauth2 with a server_metadata_url
+provider_metadata = ProviderMetadataCache(
+    oauth, {"google": settings.google_metadata_url}, pinned_file=settings.oauth_metadata_pinned_file
+)
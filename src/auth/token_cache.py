@@ -0,0 +1,54 @@
+import hashlib
+import time
+from collections import OrderedDict
+from jose import jwt
+from src.core.config.config import settings
+from src.core.metrics import meter
+
+
+class TokenCache:
+    """Bounded LRU of verified JWT claims, keyed on a token digest and evicted at `exp`."""
+
+    def __init__(self, maxsize: int, ttl: int):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._hit_counter = meter.create_counter("auth.token_cache.hits")
+        self._miss_counter = meter.create_counter("auth.token_cache.misses")
+
+    def decode(self, token: str):
+        """Return the claims of a valid token; raises JWTError when it is invalid or expired."""
+        key = hashlib.sha256(token.encode()).digest()
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, claims = entry
+            if now < expires_at:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self._hit_counter.add(1)
+                return claims
+            # Past exp (or the cache TTL): verify again so expiry is enforced by jose
+            del self._entries[key]
+
+        self.misses += 1
+        self._miss_counter.add(1)
+        claims = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+        expires_at = now + self.ttl
+        if "exp" in claims:
+            expires_at = min(expires_at, claims["exp"])
+        self._entries[key] = (expires_at, claims)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return claims
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+token_cache = TokenCache(maxsize=settings.jwt_cache_size, ttl=settings.jwt_cache_ttl_seconds)
@@ -1,4 +1,5 @@
 import os
+from typing import Optional
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
 from src.core.config.env_configurations import DevelopmentConfig, TestingConfig, ProductionConfig
@@ -8,6 +9,25 @@ class Settings(BaseSettings):
     secret_key: str
     algorithm: str
     access_token_expire_minutes: int
+    jwt_cache_size: int = 4096
+    jwt_cache_ttl_seconds: int = 300
+
+    # Password hashing
+    bcrypt_rounds: int = 12
+    password_hash_executor: str = "thread"  # "thread" or "process"
+    password_hash_workers: int = 4
+    password_hash_max_concurrency: int = 8
+
+    # Cached user + roles lookups used at login
+    user_cache_size: int = 1024
+    user_cache_ttl_seconds: int = 300
+    user_cache_local_ttl_seconds: int = 30
+
+    # Two-tier cache for GET responses; the local tier is short so other workers' writes show up quickly
+    response_cache_size: int = 2048
+    response_cache_ttl_seconds: int = 60
+    response_cache_local_ttl_seconds: int = 5
+    response_cache_tags_size: int = 10000  # recently invalidated tags remembered per worker
     
     # OAuth2 Credentials
     google_client_id: str
@@ -15,6 +35,7 @@ class Settings(BaseSettings):
     google_authorize_url: str
     google_token_url: str
     google_userinfo_url: str
+    google_metadata_url: str = "https://accounts.google.com/.well-known/openid-configuration"
     
     # GitHub OAuth2 credentials
     github_client_id: str
@@ -29,6 +50,23 @@ class Settings(BaseSettings):
     facebook_authorize_url: str
     facebook_token_url: str
     facebook_userinfo_url: str
+
+    # Provider discovery documents and JWKS, cached in Redis for all workers
+    oauth_metadata_ttl_seconds: int = 3600  # used when the provider sends no cache headers
+    oauth_metadata_min_ttl_seconds: int = 60
+    oauth_metadata_max_ttl_seconds: int = 86400
+    oauth_metadata_pinned_file: Optional[str] = None  # kill switch: serve this file, never fetch
+
+    # Outbound HTTP (OAuth providers); one pool for the app, limits and timeouts per provider
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry_seconds: float = 30
+    http_connect_timeout_seconds: float = 2
+    http_timeout_seconds: float = 5
+    http_provider_timeouts: dict[str, float] = {}  # e.g. {"facebook": 3}
+    http_provider_max_connections: int = 20
+    http_circuit_failure_threshold: int = 5
+    http_circuit_reset_seconds: float = 30
         
     # App details
     app_name: str
@@ -36,18 +74,73 @@ class Settings(BaseSettings):
     docs_url: str
     redoc_url: str
     session_secret_key: str
+    session_cookie_name: str = "session_id"
+    session_ttl_seconds: int = 86400  # idle lifetime, renewed on every request that loads the session
+    session_absolute_ttl_seconds: int = 604800  # hard cap from creation, regardless of activity
+    session_encoding: str = "json"  # "json" or "compact" (zlib-compressed)
+    session_sweep_interval_seconds: int = 300
+    oauth_state_ttl_seconds: int = 600
+    oauth_state_cookie_name: str = "oauth_state"
     redis_host: str
     redis_port: int
+    redis_max_connections: int = 50
+    redis_pool_timeout: float = 5
+    redis_socket_timeout: float = 5
+    redis_health_check_interval: int = 30
+    redis_retry_attempts: int = 3
     
     # Database
     database_url: str
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+
+    # Startup warm-up; a worker reports ready on /health/ready only once it has finished
+    db_warmup_connections: int = 5  # opened at startup, capped at db_pool_size
+    redis_warmup_connections: int = 5
+    warmup_timeout_seconds: float = 30
+    warmup_retry_seconds: float = 5  # between attempts after a failed warm-up
     
+    # Pagination
+    page_size_default: int = 50
+    page_size_max: int = 200
+
+    # Bulk inserts
+    bulk_insert_chunk_size: int = 1000
+    export_batch_size: int = 1000
+
     # Limiter
     rate_limit: str
+    rate_limit_enabled: bool = True  # off only for load tests that measure the endpoints themselves
+    api_key_digests: list[str] = []  # sha256 hex digests of X-API-Key values with their own limit
+    rate_limit_redis_retry_seconds: float = 5.0  # local buckets only, without trying Redis, after it fails
     
     # HyperDX
     hyperdx_api_key: str
 
+    # Tracing; sampling is tuned per environment through the .env files
+    otel_exporter: str = "none"  # "otlp", "console", "memory" (tests) or "none"
+    otel_endpoint: str = "https://ingest.hyperdx.io"
+    otel_service_name: str = "my-fastapi-app"
+    otel_sample_ratio: float = 0.1  # share of new traces kept up front; upstream decisions are honoured
+    otel_slow_request_ms: Optional[float] = 1000  # also keep any trace slower than this (or failed); None disables
+    otel_excluded_urls: str = ""  # comma-separated URL patterns never traced
+    sentry_dsn: Optional[str] = "https://f8aae62354afb9321a98e68c59abb20a@o4508102917160960.ingest.us.sentry.io/4508104808660992"
+    sentry_traces_sample_rate: float = 0.1
+    sentry_profiles_sample_rate: float = 0.0
+
+    # Shared directory for /metrics when several workers serve the app; unset for a single process
+    prometheus_multiproc_dir: Optional[str] = None
+
+    # Production server (manage.py serve)
+    server_workers: int = 0  # 0 means one per available CPU
+    server_keepalive_seconds: int = 5  # keep above the load balancer's idle timeout when behind one
+    server_backlog: int = 2048
+    server_graceful_timeout_seconds: int = 30
+    server_preload: bool = False  # fork workers from one imported app (needs gunicorn)
+
     class Config:
         env_file = ".env"
         extra = "allow"  
@@ -0,0 +1,207 @@
+import asyncio
+import importlib.util
+import time
+import httpx
+from fastapi import HTTPException
+from src.core.config.config import settings
+from src.core.metrics import Histogram
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised instead of calling a provider whose circuit is open."""
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failures; lets one trial call through after `reset_timeout`."""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.reset_timeout else "open"
+
+    def allow(self):
+        if self.state == "open":
+            return False
+        if self.state == "half-open":
+            # One trial at a time: push the window out until it reports back
+            self.opened_at = time.monotonic()
+        return True
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+class OutboundHTTP:
+    """One keep-alive connection pool for all outbound calls, with per-provider policies.
+
+    Each provider gets its own timeout, concurrency cap and circuit breaker, and its latency
+    is recorded under a ``provider`` attribute.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport = None):
+        # HTTP/2 needs the optional h2 package
+        self.http2 = importlib.util.find_spec("h2") is not None
+        self._transport = transport
+        self._client = None
+        self.breakers = {}
+        self._slots = {}
+        self.latency = Histogram("http.client.duration", description="Outbound HTTP request duration")
+
+    @property
+    def transport(self):
+        if self._transport is None:
+            self._transport = httpx.AsyncHTTPTransport(
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=settings.http_max_connections,
+                    max_keepalive_connections=settings.http_max_keepalive_connections,
+                    keepalive_expiry=settings.http_keepalive_expiry_seconds,
+                ),
+            )
+        return self._transport
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(transport=ProviderTransport(self, None))
+        return self._client
+
+    def transport_for(self, provider: str):
+        """Transport for clients we don't construct ourselves (e.g. Authlib's), sharing the pool."""
+        return ProviderTransport(self, provider)
+
+    async def request(self, provider: str, method: str, url: str, **kwargs):
+        return await self.client.request(method, url, extensions={"provider": provider}, **kwargs)
+
+    async def get(self, provider: str, url: str, **kwargs):
+        return await self.request(provider, "GET", url, **kwargs)
+
+    def timeout_for(self, provider: str):
+        read = settings.http_provider_timeouts.get(provider, settings.http_timeout_seconds)
+        return httpx.Timeout(read, connect=settings.http_connect_timeout_seconds)
+
+    def breaker_for(self, provider: str):
+        if provider not in self.breakers:
+            self.breakers[provider] = CircuitBreaker(
+                settings.http_circuit_failure_threshold, settings.http_circuit_reset_seconds
+            )
+        return self.breakers[provider]
+
+    def slots_for(self, provider: str):
+        # Created lazily so the semaphore binds to the serving event loop
+        if provider not in self._slots:
+            self._slots[provider] = asyncio.Semaphore(settings.http_provider_max_connections)
+        return self._slots[provider]
+
+    async def send(self, provider: str, request: httpx.Request):
+        breaker = self.breaker_for(provider)
+        if not breaker.allow():
+            raise CircuitOpenError(f"{provider} circuit is open", request=request)
+
+        timeout = self.timeout_for(provider)
+        request.extensions["timeout"] = timeout.as_dict()
+        slots = self.slots_for(provider)
+        try:
+            # A provider at its cap fails fast instead of queueing workers behind it
+            await asyncio.wait_for(slots.acquire(), timeout.connect)
+        except asyncio.TimeoutError:
+            raise httpx.PoolTimeout(f"{provider} connection limit reached", request=request)
+
+        started = time.perf_counter()
+        try:
+            response = await self.transport.handle_async_request(request)
+        except BaseException as exc:
+            slots.release()
+            if isinstance(exc, httpx.TransportError):
+                breaker.record_failure()
+            self.latency.observe(time.perf_counter() - started, {"provider": provider, "outcome": "error"})
+            raise
+        self.latency.observe(time.perf_counter() - started, {"provider": provider, "outcome": str(response.status_code)})
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        # The slot is held until the body has been read and the connection handed back
+        response.stream = _ReleasingStream(response.stream, slots.release)
+        return response
+
+    def stats(self):
+        return {
+            "http2": self.http2,
+            "providers": {
+                provider: {"circuit": breaker.state, "consecutive_failures": breaker.failures}
+                for provider, breaker in self.breakers.items()
+            },
+            "latency": self.latency.snapshot(),
+        }
+
+    async def close(self):
+        if self._transport is not None:
+            await self._transport.aclose()
+        self._transport = None
+        self._client = None
+        self._slots.clear()
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._release is not None:
+                self._release()
+                self._release = None
+
+
+class ProviderTransport(httpx.AsyncBaseTransport):
+    """Routes a client's requests through the shared pool under a provider's policy."""
+
+    def __init__(self, outbound: OutboundHTTP, provider: str):
+        self.outbound = outbound
+        self.provider = provider
+
+    async def handle_async_request(self, request: httpx.Request):
+        provider = request.extensions.get("provider") or self.provider or request.url.host
+        return await self.outbound.send(provider, request)
+
+    async def aclose(self):
+        # The pool outlives the per-call clients Authlib opens and closes around it
+        pass
+
+
+http_client = OutboundHTTP()
+
+
+async def fetch_userinfo(provider: str, url: str, token: dict):
+    """GET a provider's userinfo endpoint with the user's access token, mapping upstream failures to 5xx."""
+    try:
+        response = await http_client.get(provider, url, headers={"Authorization": f"Bearer {token['access_token']}"})
+        response.raise_for_status()
+    except CircuitOpenError:
+        raise HTTPException(status_code=503, detail=f"{provider} is temporarily unavailable")
+    except httpx.TimeoutException:
+        raise HTTPException(status_code=504, detail=f"{provider} did not respond in time")
+    except httpx.HTTPError as exc:
+        raise HTTPException(status_code=502, detail=f"{provider} request failed: {exc}")
+    return response.json()
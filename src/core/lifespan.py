@@ -0,0 +1,143 @@
+"""Startup and shutdown of the app's shared resources, as one lifespan context.
+
+Startup warms the pools a request would otherwise open on first use: the database check
+creates any missing tables, then opens ``db_warmup_connections`` connections, while
+``redis_warmup_connections`` Redis connections open concurrently; the OAuth provider metadata
+follows. ``readiness`` records the outcome for ``/health/ready``. A worker whose warm-up failed,
+a database that is down included, still starts, reports not ready and retries in the
+background. Shutdown releases everything in the reverse order.
+"""
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from sqlalchemy import text
+from src.auth.auth import shutdown_hash_executor
+from src.auth.provider_metadata import provider_metadata
+from src.core.config.config import settings
+from src.core.http_client import http_client
+from src.core.telemetry import init_sentry, shutdown_telemetry
+from src.middleware.session import session_sweeper
+from src.models.models import async_engine, init_db
+from src.redis_client import redis_conn
+
+# Without these a worker cannot serve most requests; OAuth metadata is fetched lazily if missing
+REQUIRED_CHECKS = ("database", "redis")
+
+
+class Readiness:
+    """Outcome of the last warm-up, per resource."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.checks = {}
+        self.warmed_up = False
+
+    @property
+    def ready(self):
+        return self.warmed_up
+
+    def report(self):
+        return {"status": "ready" if self.warmed_up else "starting", "checks": dict(self.checks)}
+
+
+readiness = Readiness()
+
+
+def _pool_capacity(pool, wanted: int):
+    # Connections beyond pool_size would be closed again as soon as they are returned; pools
+    # without a size (NullPool, StaticPool for SQLite) keep nothing, so one checks connectivity
+    size = getattr(pool, "size", None)
+    return min(wanted, size()) if callable(size) else min(wanted, 1)
+
+
+async def warm_database(connections: int = None):
+    """Open up to `connections` pooled connections at once and leave them idle in the pool."""
+    wanted = _pool_capacity(async_engine.sync_engine.pool, settings.db_warmup_connections if connections is None else connections)
+    opened = 0
+    all_open = asyncio.Event()
+
+    async def check_out():
+        nonlocal opened
+        try:
+            async with async_engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                opened += 1
+                if opened == wanted:
+                    all_open.set()
+                # Held until every connection is open, so each checkout opens a new one
+                await all_open.wait()
+        except Exception:
+            all_open.set()  # release the others rather than leave them waiting for the timeout
+            raise
+
+    await asyncio.gather(*(check_out() for _ in range(wanted)))
+    return wanted
+
+
+async def prepare_database():
+    """Create missing tables, then warm the pool."""
+    # Workers starting together may race to create a table; the loser fails this check and
+    # the retry finds the table in place
+    await init_db()
+    return await warm_database()
+
+
+async def warm_redis(connections: int = None):
+    """Open up to `connections` Redis connections by pinging on all of them concurrently."""
+    wanted = min(settings.redis_warmup_connections if connections is None else connections, settings.redis_max_connections)
+    redis = await redis_conn.get_redis()
+    await asyncio.gather(*(redis.ping() for _ in range(max(wanted, 1))))
+    return wanted
+
+
+async def _check(name: str, warm):
+    try:
+        await asyncio.wait_for(warm(), settings.warmup_timeout_seconds)
+        readiness.checks[name] = "ok"
+    except Exception as exc:
+        readiness.checks[name] = f"error: {exc!r}"
+        logging.warning("Warming up %s failed: %s", name, exc)
+
+
+async def warm_up():
+    await asyncio.gather(_check("database", prepare_database), _check("redis", warm_redis))
+    # Needs Redis: other workers may already have cached the documents there
+    await _check("oauth_metadata", provider_metadata.start)
+    readiness.warmed_up = all(readiness.checks.get(name) == "ok" for name in REQUIRED_CHECKS)
+    return readiness.warmed_up
+
+
+async def _retry_warm_up():
+    while not await warm_up():
+        await asyncio.sleep(settings.warmup_retry_seconds)
+    logging.info("Warm-up finished after retrying")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    readiness.reset()
+    init_sentry()
+    await redis_conn.initialize()
+    session_sweeper.start()
+    retry = None
+    if not await warm_up():
+        # Serve anyway; /health/ready keeps the load balancer away until this succeeds
+        retry = asyncio.get_running_loop().create_task(_retry_warm_up())
+    try:
+        yield
+    finally:
+        if retry is not None:
+            retry.cancel()
+            try:
+                await retry
+            except asyncio.CancelledError:
+                pass
+        await provider_metadata.stop()
+        await session_sweeper.stop()
+        await http_client.close()
+        await redis_conn.close()
+        await async_engine.dispose()
+        shutdown_telemetry()
+        shutdown_hash_executor()
@@ -0,0 +1,32 @@
+import bisect
+from opentelemetry import metrics
+
+# No-op until a MeterProvider is configured
+meter = metrics.get_meter("fastgenapi")
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Bucketed histogram kept in-process and mirrored to an OTel instrument."""
+
+    def __init__(self, name: str, description: str = "", unit: str = "s", buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._instrument = meter.create_histogram(name, unit=unit, description=description)
+
+    def observe(self, value: float, attributes: dict = None):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self._instrument.record(value, attributes=attributes)
+
+    def snapshot(self):
+        cumulative, total = {}, 0
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            total += count
+            cumulative[str(bound)] = total
+        return {"buckets": cumulative, "sum": self.sum, "count": self.count}
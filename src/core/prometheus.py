@@ -0,0 +1,116 @@
+import os
+import time
+from contextvars import ContextVar
+from sqlalchemy import event
+from src.core.config.config import settings
+from src.core.metrics import LATENCY_BUCKETS
+
+# prometheus_client picks per-process or shared-file storage when it is first imported, so the
+# directory has to be in the environment before that. Each worker writes its own files there
+# and /metrics aggregates them, whichever worker serves the scrape.
+if settings.prometheus_multiproc_dir:
+    os.makedirs(settings.prometheus_multiproc_dir, exist_ok=True)
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = settings.prometheus_multiproc_dir
+
+from prometheus_client import (  # noqa: E402
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Redis round trips are usually well under a millisecond
+REDIS_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Labels are route templates and known methods only, so series stay bounded whatever clients send
+UNMATCHED_ROUTE = "<unmatched>"
+METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+http_requests = Counter(
+    "http_requests_total", "HTTP requests handled", ["method", "route", "status"]
+)
+http_in_progress = Gauge(
+    "http_requests_in_progress", "HTTP requests being handled", ["method"], multiprocess_mode="livesum"
+)
+http_latency = Histogram(
+    "http_request_duration_seconds", "HTTP request duration", ["method", "route"], buckets=LATENCY_BUCKETS
+)
+db_queries = Histogram(
+    "http_request_db_queries", "Database queries issued per HTTP request", ["route"], buckets=QUERY_COUNT_BUCKETS
+)
+db_time = Histogram(
+    "http_request_db_duration_seconds", "Time per HTTP request spent in database queries", ["route"],
+    buckets=LATENCY_BUCKETS,
+)
+redis_latency = Histogram(
+    "redis_command_duration_seconds", "Redis command round-trip time", ["command"], buckets=REDIS_BUCKETS
+)
+
+
+class QueryStats:
+    """Database work done on behalf of one request."""
+
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+# Set by the metrics middleware; the engine hooks add to it. SQLAlchemy's async greenlets
+# run in the caller's context, so queries land on the request that issued them.
+request_queries = ContextVar("request_queries", default=None)
+
+
+def instrument_engine(engine):
+    """Count and time every statement `engine` executes against the current request."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _query_started(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _query_finished(conn, cursor, statement, parameters, context, executemany):
+        stats = request_queries.get()
+        if stats is None or context is None:
+            return
+        stats.count += 1
+        stats.seconds += time.perf_counter() - context._metrics_started
+
+
+def observe_redis(command, seconds: float):
+    if isinstance(command, bytes):
+        command = command.decode()
+    redis_latency.labels(str(command).split(" ", 1)[0].upper()).observe(seconds)
+
+
+def route_label(scope):
+    # Set by the router once it has matched the request, e.g. /api/v1/users/{user_id}
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+def method_label(method: str):
+    return method if method in METHODS else "OTHER"
+
+
+def render():
+    """The exposition text for every metric, summed across workers in multiprocess mode."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry)
+
+
+def mark_process_dead(pid: int):
+    """Drop a stopped worker's live gauges (gunicorn's child_exit hook)."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,277 @@
+import asyncio
+import functools
+import hashlib
+import inspect
+import logging
+import orjson
+from urllib.parse import urlencode
+from fastapi import HTTPException, Request
+from jose import JWTError
+from redis.exceptions import RedisError
+from src.auth.token_cache import token_cache
+from src.core.cache import LRUCache
+from src.core.config.config import settings
+from src.core.metrics import meter
+from src.redis_client import redis_conn
+
+# Shared per-tag generations outlive any load by far; an expired one only causes extra misses
+GENERATION_TTL = 86400
+
+# Stores an entry unless one of its tags was invalidated, by any worker, after its load began.
+# KEYS: the entry, then each tag's generation, then each tag's member set.
+# ARGV: payload, ttl, then the generations read before loading.
+STORE_SCRIPT = """
+local tags = (#KEYS - 1) / 2
+for i = 1, tags do
+    if (redis.call('GET', KEYS[1 + i]) or '0') ~= ARGV[2 + i] then
+        return 0
+    end
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+for i = 1, tags do
+    redis.call('SADD', KEYS[1 + tags + i], KEYS[1])
+    redis.call('EXPIRE', KEYS[1 + tags + i], ARGV[2])
+end
+return 1
+"""
+
+# Bumps each tag's generation and deletes its entries in one step, so no worker sees one without the other.
+# KEYS: generation and member set for each tag, in pairs. ARGV: the generation TTL.
+INVALIDATE_SCRIPT = """
+for i = 1, #KEYS, 2 do
+    redis.call('INCR', KEYS[i])
+    redis.call('EXPIRE', KEYS[i], ARGV[1])
+    local members = redis.call('SMEMBERS', KEYS[i + 1])
+    for j = 1, #members, 1000 do
+        redis.call('DEL', unpack(members, j, math.min(j + 999, #members)))
+    end
+    redis.call('DEL', KEYS[i + 1])
+end
+return 1
+"""
+
+
+class ResponseCache:
+    """Two-tier cache for read responses: a short-lived in-process LRU in front of Redis.
+
+    Entries carry tags (e.g. ``user:42``) so writes can drop everything derived from a row.
+    Concurrent misses for the same key share one load. A load is only stored in Redis if no
+    worker invalidated one of its tags meanwhile; other workers' local tiers may still serve
+    the old value for up to ``local_ttl``.
+    """
+
+    def __init__(self, maxsize: int, ttl: int, local_ttl: int, tags_size: int = 10000):
+        self.ttl = ttl
+        self.local = LRUCache(maxsize=maxsize, ttl=local_ttl)
+        # Ticks on every invalidation. Local entries are stamped with the clock when they were
+        # loaded; one whose tag was invalidated later is stale.
+        self._clock = 0
+        self._invalidated_at = LRUCache(maxsize=tags_size, ttl=float("inf"))
+        # Tags evicted from _invalidated_at count as invalidated at this tick, so forgetting one
+        # can only turn entries into misses, never serve a stale one
+        self._floor = 0
+        self._scripts = {}
+        self._inflight = {}
+        self.counts = {"local": 0, "redis": 0, "miss": 0, "coalesced": 0}
+        self._requests = meter.create_counter(
+            "cache.responses.requests", description="Response cache lookups by outcome"
+        )
+
+    async def get_or_load(self, key: str, loader, tags=(), ttl: int = None):
+        entry = self.local.get(key)
+        if entry is not None and self._is_current(entry[1]):
+            self._count("local")
+            return entry[0]
+
+        # The entry and its tags' shared generations in one round trip
+        found = await self._redis_call("mget", key, *(_generation_key(tag) for tag in tags))
+        raw, generations = (found[0], found[1:]) if found else (None, None)
+        if raw is not None:
+            value = orjson.loads(raw)
+            self.local.set(key, (value, self._stamp(tags)))
+            self._count("redis")
+            return value
+
+        # Single flight: the first miss loads, later ones wait for its result
+        pending = self._inflight.get(key)
+        if pending is not None:
+            try:
+                value = await asyncio.shield(pending)
+                self._count("coalesced")
+                return value
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+            # The loading request failed; load independently rather than share its error
+            self._count("miss")
+            return await loader()
+
+        self._count("miss")
+        stamp = self._stamp(tags)
+        pending = self._inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            value = await loader()
+        except BaseException:
+            pending.cancel()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        pending.set_result(value)
+        # A write that landed while we were loading makes this result stale already
+        if self._is_current(stamp):
+            await self._store(key, value, stamp, generations, self.ttl if ttl is None else ttl)
+        return value
+
+    async def invalidate(self, *tags: str):
+        self._tick(tags)
+        keys = [key for tag in tags for key in (_generation_key(tag), _tag_key(tag))]
+        await self._run_script(INVALIDATE_SCRIPT, keys, [GENERATION_TTL])
+        # Entries read from Redis before the deletes landed were stamped current; retire them too
+        self._tick(tags)
+
+    def _tick(self, tags):
+        self._clock += 1
+        for tag in tags:
+            if self._invalidated_at.get(tag) is None and len(self._invalidated_at) >= self._invalidated_at.maxsize:
+                self._floor = self._clock - 1  # the tag about to be evicted was invalidated no later
+            self._invalidated_at.set(tag, self._clock)
+
+    def clear(self):
+        self.local.clear()
+        self._invalidated_at.clear()
+        self._clock = self._floor = 0
+
+    def stats(self):
+        lookups = self.counts["local"] + self.counts["redis"] + self.counts["miss"] + self.counts["coalesced"]
+        hits = lookups - self.counts["miss"]
+        return {
+            **self.counts,
+            "local_size": len(self.local),
+            "hit_ratio": hits / lookups if lookups else 0.0,
+        }
+
+    def _count(self, outcome: str):
+        self.counts[outcome] += 1
+        self._requests.add(1, {"outcome": outcome})
+
+    def _is_current(self, stamp):
+        loaded_at, tags = stamp
+        return all(self._invalidated_at.get(tag, self._floor) <= loaded_at for tag in tags)
+
+    def _stamp(self, tags):
+        return self._clock, tuple(tags)
+
+    async def _store(self, key: str, value, stamp, generations, ttl: int):
+        self.local.set(key, (value, stamp))
+        if generations is None:
+            return  # Redis was unreachable when the load began
+        tags = stamp[1]
+        keys = [key, *(_generation_key(tag) for tag in tags), *(_tag_key(tag) for tag in tags)]
+        stored = await self._run_script(STORE_SCRIPT, keys, [orjson.dumps(value), ttl, *(g or "0" for g in generations)])
+        if stored == 0:
+            # Another worker invalidated a tag while this one was loading
+            self.local.delete(key)
+
+    async def _run_script(self, source: str, keys, args):
+        try:
+            redis = await redis_conn.get_redis()
+            script = self._scripts.get(source)
+            if script is None:
+                script = self._scripts[source] = redis.register_script(source)
+            return await script(keys=keys, args=args, client=redis)
+        except (RedisError, HTTPException) as exc:
+            logging.warning("Response cache script failed: %s", exc)
+            return None
+
+    async def _redis_call(self, command: str, *args, **kwargs):
+        # Redis being down degrades to the local tier and the database
+        try:
+            redis = await redis_conn.get_redis()
+            return await getattr(redis, command)(*args, **kwargs)
+        except (RedisError, HTTPException) as exc:
+            logging.warning("Response cache %s failed: %s", command, exc)
+            return None
+
+
+def _tag_key(tag: str):
+    return f"cache:tag:{tag}"
+
+
+def _generation_key(tag: str):
+    return f"cache:generation:{tag}"
+
+
+def auth_scope(request: Request, vary_on: str):
+    """The part of the caller's identity a cached response may depend on."""
+    if vary_on is None:
+        return "public"
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return "anonymous"
+    try:
+        claims = token_cache.decode(token)
+    except JWTError:
+        return "anonymous"
+    if vary_on == "roles":
+        scope = ",".join(sorted(claims.get("roles", [])))
+    else:
+        scope = claims.get("sub", "")
+    return hashlib.sha256(scope.encode()).hexdigest()[:16]
+
+
+def cached(namespace: str, model=None, tags=None, ttl: int = None, vary_on: str = "user"):
+    """Cache a GET endpoint's result, keyed on its path and query params and the caller's auth scope.
+
+    ``model`` serialises the result before it is stored and is returned on every call; ``tags`` maps the path params to
+    invalidation tags; ``vary_on`` is ``"user"``, ``"roles"`` or ``None`` for responses that
+    are the same for everyone.
+    """
+
+    def decorator(endpoint):
+        signature = inspect.signature(endpoint)
+        request_param = next(
+            (name for name, param in signature.parameters.items() if param.annotation is Request), None
+        )
+
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            request = kwargs[request_param] if request_param else kwargs.pop("_cache_request")
+            params = dict(request.path_params)
+            key = "cache:{}:{}:{}".format(
+                namespace,
+                auth_scope(request, vary_on),
+                "&".join(f"{name}={params[name]}" for name in sorted(params)),
+            )
+            if request.query_params:
+                # Sorted, so the same query in another order shares the entry
+                key += "?" + urlencode(sorted(request.query_params.multi_items()))
+
+            async def load():
+                result = await endpoint(*args, **kwargs)
+                # Store what FastAPI would send, so hits skip ORM work entirely
+                if model is not None:
+                    return model.model_validate(result).model_dump(mode="json")
+                return result
+
+            value = await response_cache.get_or_load(key, load, tags(params) if tags else (), ttl)
+            # A model instance is sent without FastAPI validating it a second time
+            return model.model_validate(value) if model is not None else value
+
+        if request_param is None:
+            wrapper.__signature__ = signature.replace(
+                parameters=[
+                    *signature.parameters.values(),
+                    inspect.Parameter("_cache_request", inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+                ]
+            )
+        return wrapper
+
+    return decorator
+
+
+response_cache = ResponseCache(
+    maxsize=settings.response_cache_size,
+    ttl=settings.response_cache_ttl_seconds,
+    local_ttl=settings.response_cache_local_ttl_seconds,
+    tags_size=settings.response_cache_tags_size,
+)
@@ -0,0 +1,79 @@
+import asyncio
+import functools
+import inspect
+from fastapi import Response
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.responses import ORJSONResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+
+
+class ModelJSONResponse(ORJSONResponse):
+    """orjson response that renders pydantic models with their own compiled serializer."""
+
+    def render(self, content) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.model_dump_json(by_alias=True).encode()
+        return super().render(content)
+
+
+def _resolve(value):
+    return value.value if isinstance(value, DefaultPlaceholder) else value
+
+
+class ModelRoute(APIRoute):
+    """Route that sends an already-validated instance of its response_model as is.
+
+    FastAPI otherwise dumps the model, validates the dump against response_model again and
+    runs it through jsonable_encoder before rendering. Other return values take that path
+    unchanged.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        response_model = _resolve(kwargs.get("response_model"))
+        response_class = _resolve(kwargs.get("response_class", ModelJSONResponse))
+        # Include/exclude options need FastAPI's own serialisation
+        filtered = any(kwargs.get(option) for option in (
+            "response_model_include", "response_model_exclude", "response_model_exclude_unset",
+            "response_model_exclude_defaults", "response_model_exclude_none",
+        ))
+        if (
+            isinstance(response_model, type)
+            and issubclass(response_model, BaseModel)
+            and issubclass(response_class, ModelJSONResponse)
+            and asyncio.iscoroutinefunction(endpoint)
+            and not filtered
+            # Routes are rebuilt from their endpoint when a router is included
+            and not getattr(endpoint, "__sends_models__", False)
+        ):
+            endpoint = _send_models_directly(endpoint, response_model, response_class, kwargs.get("status_code"))
+        super().__init__(path, endpoint, **kwargs)
+
+
+def _send_models_directly(endpoint, response_model, response_class, status_code):
+    signature = inspect.signature(endpoint)
+    # FastAPI injects the sub-response into one parameter only; reuse the endpoint's if it has one
+    response_param = next(
+        (name for name, param in signature.parameters.items() if param.annotation is Response), None
+    )
+
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        sub_response = kwargs[response_param] if response_param else kwargs.pop("_sub_response")
+        result = await endpoint(*args, **kwargs)
+        if type(result) is not response_model:
+            return result
+        response = response_class(result, status_code=sub_response.status_code or status_code or 200)
+        # Headers set through an injected Response (e.g. ETag) would otherwise be dropped
+        response.headers.raw.extend(sub_response.headers.raw)
+        return response
+
+    wrapper.__sends_models__ = True
+    if response_param is None:
+        wrapper.__signature__ = signature.replace(
+            parameters=[
+                *signature.parameters.values(),
+                inspect.Parameter("_sub_response", inspect.Parameter.KEYWORD_ONLY, annotation=Response),
+            ]
+        )
+    return wrapper
@@ -0,0 +1,131 @@
+"""Production server: uvicorn workers with uvloop and httptools, or gunicorn when preloading.
+
+Without preloading, uvicorn's supervisor spawns each worker, and every worker imports the app
+itself. With ``preload``, gunicorn imports it once and forks the workers, so they share the
+imported code and data pages copy-on-write until they write to them.
+"""
+import atexit
+import gc
+import glob
+import importlib.util
+import logging
+import os
+import shutil
+import tempfile
+import uvicorn
+from src.core.config.config import settings
+
+APP = "src.main:app"
+
+
+def default_workers():
+    """One worker per CPU this process may run on; async workers need no more than that."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS or Windows
+        return os.cpu_count() or 1
+
+
+def event_loop():
+    # uvloop has no Windows build
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def uvicorn_options(keepalive: int, backlog: int, graceful_timeout: int, access_log: bool):
+    return {
+        "loop": event_loop(),
+        "http": "httptools",
+        "lifespan": "on",
+        "timeout_keep_alive": keepalive,
+        "backlog": backlog,
+        # Time in-flight requests get to finish after SIGTERM, before lifespan shutdown runs
+        "timeout_graceful_shutdown": graceful_timeout,
+        "access_log": access_log,
+        "proxy_headers": True,
+    }
+
+
+def prepare_metrics_dir(workers: int):
+    """Share /metrics across workers, starting from an empty directory each run."""
+    # The directory src.core.prometheus will use; the setting also reads PROMETHEUS_MULTIPROC_DIR
+    directory = settings.prometheus_multiproc_dir or os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if directory is None:
+        if workers == 1:
+            return None
+        # Unique per run, so two instances on one host never add up each other's counters
+        directory = tempfile.mkdtemp(prefix="fastgenapi-metrics-")
+        atexit.register(_remove_metrics_dir, directory, os.getpid())
+    # Spawned workers read it from the environment
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = directory
+    os.makedirs(directory, exist_ok=True)
+    # Files from a previous run would be summed into this one's counters
+    for stale in glob.glob(os.path.join(directory, "*.db")):
+        os.remove(stale)
+    return directory
+
+
+def _remove_metrics_dir(directory: str, owner: int):
+    # Forked workers inherit atexit handlers; only the supervisor that made the directory removes it
+    if os.getpid() == owner:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def serve(host: str, port: int, workers: int, keepalive: int, backlog: int, graceful_timeout: int,
+          access_log: bool = False, preload: bool = False):
+    prepare_metrics_dir(workers)
+    options = uvicorn_options(keepalive, backlog, graceful_timeout, access_log)
+    if preload:
+        _serve_preloaded(host, port, workers, options, graceful_timeout)
+    else:
+        # An import string, so each spawned worker loads the app itself
+        uvicorn.run(APP, host=host, port=port, workers=workers, **options)
+
+
+def _serve_preloaded(host, port, workers, options, graceful_timeout):
+    try:
+        from gunicorn.app.base import BaseApplication
+        from uvicorn.workers import UvicornWorker
+    except ImportError:
+        raise RuntimeError("Preloading needs gunicorn: pip install 'fastgenapi[preload]'")
+
+    class Worker(UvicornWorker):
+        # Gunicorn passes keep-alive and backlog itself; the rest comes from here
+        CONFIG_KWARGS = {
+            key: value for key, value in options.items() if key not in ("timeout_keep_alive", "backlog")
+        }
+
+    class PreloadedApplication(BaseApplication):
+        def load_config(self):
+            config = {
+                "bind": f"{host}:{port}",
+                "workers": workers,
+                "worker_class": Worker,
+                "preload_app": True,
+                "keepalive": options["timeout_keep_alive"],
+                "backlog": options["backlog"],
+                "graceful_timeout": graceful_timeout,
+                "when_ready": _when_ready,
+                "child_exit": _child_exit,
+            }
+            for key, value in config.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from src.main import app
+
+            return app
+
+    PreloadedApplication().run()
+
+
+def _when_ready(server):
+    # Objects imported so far are never collected, so collections in the workers do not
+    # touch (and un-share) the pages they live on
+    gc.freeze()
+    logging.info("Preloaded app; %s objects frozen before forking", gc.get_freeze_count())
+
+
+def _child_exit(server, worker):
+    from src.core.prometheus import mark_process_dead
+
+    mark_process_dead(worker.pid)
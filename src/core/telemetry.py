@@ -0,0 +1,231 @@
+import logging
+import threading
+import sentry_sdk
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, SpanProcessor, TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter, SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.sdk.trace.sampling import Decision, ParentBased, Sampler, SamplingResult, TraceIdRatioBased
+from opentelemetry.semconv.trace import SpanAttributes
+from opentelemetry.trace import SpanContext, StatusCode, TraceFlags
+from opentelemetry.util.http import parse_excluded_urls
+from starlette.routing import Match
+from src.core.cache import LRUCache
+from src.core.config.config import settings
+
+# Unsampled traces waiting for their root span; a root that never ends is evicted after this long
+PENDING_TRACE_TTL = 60
+
+tracer_provider = None
+
+
+class _RecordOnly(Sampler):
+    """Records spans without sampling them, so the tail sampler can still keep the trace."""
+
+    def should_sample(self, parent_context, trace_id, name, kind=None, attributes=None, links=None, trace_state=None):
+        parent = trace.get_current_span(parent_context).get_span_context()
+        return SamplingResult(Decision.RECORD_ONLY, attributes, parent.trace_state if parent.is_valid else None)
+
+    def get_description(self):
+        return "RecordOnly"
+
+
+class _HeadOrRecord(Sampler):
+    """Samples `ratio` of new traces up front and records the rest for tail sampling."""
+
+    def __init__(self, ratio: float):
+        self.head = TraceIdRatioBased(ratio)
+
+    def should_sample(self, parent_context, trace_id, name, kind=None, attributes=None, links=None, trace_state=None):
+        result = self.head.should_sample(parent_context, trace_id, name, kind, attributes, links, trace_state)
+        if result.decision is Decision.DROP:
+            return SamplingResult(Decision.RECORD_ONLY, attributes, result.trace_state)
+        return result
+
+    def get_description(self):
+        return f"HeadOrRecord{{{self.head.get_description()}}}"
+
+
+def build_sampler():
+    """Parent-based ratio sampling; with tail sampling on, the rest of the traces are recorded too."""
+    if not settings.otel_slow_request_ms:
+        return ParentBased(root=TraceIdRatioBased(settings.otel_sample_ratio))
+    # An upstream "not sampled" decision is still honoured; only traces that start here are tail sampled
+    return ParentBased(root=_HeadOrRecord(settings.otel_sample_ratio), local_parent_not_sampled=_RecordOnly())
+
+
+class TailSamplingProcessor(SpanProcessor):
+    """Exports head-sampled spans as they end, and holds the rest of a trace until its root ends.
+
+    A held trace is exported only if its root span was slow or failed, so the exporter sees every
+    slow or broken request without paying for the fast ones that were not sampled.
+    """
+
+    def __init__(self, delegate: SpanProcessor, slow_ms: float, max_traces: int = 4096):
+        self.delegate = delegate
+        self.slow_ms = slow_ms
+        self._pending = LRUCache(maxsize=max_traces, ttl=PENDING_TRACE_TTL)
+        self._lock = threading.Lock()
+
+    def on_start(self, span, parent_context=None):
+        self.delegate.on_start(span, parent_context=parent_context)
+
+    def on_end(self, span: ReadableSpan):
+        if span.context.trace_flags.sampled:
+            self.delegate.on_end(span)
+            return
+
+        trace_id = span.context.trace_id
+        with self._lock:
+            if span.parent is not None and not span.parent.is_remote:
+                self._pending.set(trace_id, [*self._pending.get(trace_id, ()), span])
+                return
+            spans = [*self._pending.get(trace_id, ()), span]
+            self._pending.delete(trace_id)
+
+        reason = self._keep_reason(span)
+        if reason:
+            for held in spans:
+                self.delegate.on_end(_as_sampled(held, reason))
+
+    def _keep_reason(self, root: ReadableSpan):
+        if root.status.status_code is StatusCode.ERROR:
+            return "error"
+        if (root.end_time - root.start_time) / 1e6 >= self.slow_ms:
+            return "slow"
+        return None
+
+    def shutdown(self):
+        self.delegate.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000):
+        return self.delegate.force_flush(timeout_millis)
+
+
+def _as_sampled(span: ReadableSpan, reason: str):
+    # Exporting processors skip unsampled spans, so hand them a sampled copy
+    context = SpanContext(
+        span.context.trace_id,
+        span.context.span_id,
+        is_remote=False,
+        trace_flags=TraceFlags(TraceFlags.SAMPLED),
+        trace_state=span.context.trace_state,
+    )
+    return ReadableSpan(
+        name=span.name,
+        context=context,
+        parent=span.parent,
+        resource=span.resource,
+        attributes={**(span.attributes or {}), "sampling.reason": reason},
+        events=span.events,
+        links=span.links,
+        kind=span.kind,
+        status=span.status,
+        start_time=span.start_time,
+        end_time=span.end_time,
+        instrumentation_scope=span.instrumentation_scope,
+    )
+
+
+def build_exporter(name: str):
+    if name == "otlp":
+        # The gRPC exporter is slow to import, so only load it when it is used
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+
+        return OTLPSpanExporter(
+            endpoint=settings.otel_endpoint,
+            headers={"x-hdx-auth-token": settings.hyperdx_api_key},
+        )
+    if name == "console":
+        return ConsoleSpanExporter()
+    if name == "memory":
+        return InMemorySpanExporter()
+    raise ValueError(f"Unknown OTEL exporter {name!r}; expected otlp, console, memory or none")
+
+
+def build_tracer_provider(exporter, batch: bool = True):
+    provider = TracerProvider(
+        resource=Resource.create(attributes={"service.name": settings.otel_service_name}),
+        sampler=build_sampler(),
+    )
+    processor = BatchSpanProcessor(exporter) if batch else SimpleSpanProcessor(exporter)
+    if settings.otel_slow_request_ms:
+        processor = TailSamplingProcessor(processor, settings.otel_slow_request_ms)
+    provider.add_span_processor(processor)
+    return provider
+
+
+def instrument(provider):
+    """Trace SQLAlchemy and Redis calls when their instrumentations are installed."""
+    try:
+        from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+        from src.models.models import async_engine
+
+        SQLAlchemyInstrumentor().instrument(engine=async_engine.sync_engine, tracer_provider=provider)
+    except ImportError as exc:
+        logging.warning("SQLAlchemy tracing disabled: %s", exc)
+
+    try:
+        from opentelemetry.instrumentation.redis import RedisInstrumentor
+
+        RedisInstrumentor().instrument(tracer_provider=provider)
+    except ImportError as exc:
+        logging.warning("Redis tracing disabled: %s", exc)
+
+
+def configure_telemetry():
+    """Install the tracer provider chosen by settings.otel_exporter; a no-op when it is "none"."""
+    global tracer_provider
+    if settings.otel_exporter == "none" or tracer_provider is not None:
+        return tracer_provider
+    exporter = build_exporter(settings.otel_exporter)
+    # Batching only pays off for exporters that go over the network
+    tracer_provider = build_tracer_provider(exporter, batch=settings.otel_exporter == "otlp")
+    trace.set_tracer_provider(tracer_provider)
+    instrument(tracer_provider)
+    return tracer_provider
+
+
+def span_details(scope):
+    """Span name and attributes for a request, named after its route template, e.g. ``GET /users/{user_id}``."""
+    # Runs before routing, so the route is matched here the way the router will match it
+    route = None
+    for candidate in scope["app"].routes:
+        match, _ = candidate.matches(scope)
+        if match is Match.FULL:
+            route = candidate.path
+            break
+        if match is Match.PARTIAL and route is None:
+            route = candidate.path  # wrong method: still name the span after the route
+    method = scope.get("method", "").strip() or "HTTP"
+    if route is None:
+        return method, {}
+    return f"{method} {route}", {SpanAttributes.HTTP_ROUTE: route}
+
+
+def tracing_middleware_options(provider):
+    """Options for the ASGI tracing layer, matching what FastAPIInstrumentor would install."""
+    return {
+        "tracer_provider": provider,
+        "excluded_urls": parse_excluded_urls(settings.otel_excluded_urls),
+        "default_span_details": span_details,
+    }
+
+
+def shutdown_telemetry():
+    """Flush spans still queued for export."""
+    if tracer_provider is not None:
+        tracer_provider.shutdown()
+
+
+def init_sentry():
+    # Deferred to startup so importing the app (tests, --reload) skips client and profiler setup
+    if not settings.sentry_dsn:
+        return
+    sentry_sdk.init(
+        dsn=settings.sentry_dsn,
+        traces_sample_rate=settings.sentry_traces_sample_rate,
+        # Share of *sampled* transactions that are also profiled
+        profiles_sample_rate=settings.sentry_profiles_sample_rate,
+    )
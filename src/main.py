@@ -1,61 +1,19 @@
-from fastapi import FastAPI, Request, Depends
-from slowapi.middleware import SlowAPIMiddleware
-from slowapi.errors import RateLimitExceeded
-from starlette.responses import JSONResponse
+from fastapi import FastAPI, Request, Depends, Response
 from src.api.v1.endpoints import router as api_router
 from src.middleware.error_handler import add_error_handlers
+from src.middleware.pipeline import install_middleware, skip_middleware
+from src.core.lifespan import readiness
+from src.core.prometheus import CONTENT_TYPE_LATEST, render as render_metrics
 from src.core.config.config import settings
-from src.redis import redis_conn
 from src.core.config.config import app_config
 from src.security.limiter import limiter
-from starlette.middleware.sessions import SessionMiddleware as StarletteSessionMiddleware
-from fastapi.middleware.cors import CORSMiddleware
 from src.app import app
 
 
-# Attach limiter state and add exception handler for rate limit errors
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, lambda request, exc: JSONResponse(
-    status_code=429,
-    content={"message": "Rate limit exceeded"},
-))
-
-# Add SlowAPI middleware for rate limiting
-app.add_middleware(SlowAPIMiddleware)
-
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost", "http://localhost:3000", "http://localhost:8000"],
-    allow_methods=["GET", "POST"],
-    allow_headers=["*"],
-)
-
-# Middleware for Redis session management
-@app.middleware("http")
-async def redis_session_middleware(request: Request, call_next):
-    redis = await redis_conn.get_redis()
-    session_id = request.cookies.get("session_id")
-    if session_id:
-        request.state.session = await redis.get(f"session:{session_id}") or {}
-    else:
-        request.state.session = {}
-
-    response = await call_next(request)
-
-    if session_id and request.state.session:
-        await redis.set(f"session:{session_id}", str(request.state.session))
-
-    return response
-
-# Startup event to initialize Redis
-@app.on_event("startup")
-async def startup():
-    await redis_conn.initialize()
-
 # Apply rate limiting to a specific route
 @app.get("/")
 @limiter.limit("5/minute")
+@skip_middleware("session", "cookie_session")
 async def root(request: Request):
     return {"message": "API is running"}
 
@@ -70,6 +28,29 @@ def get_config():
     }
     
     
+# Scraped by Prometheus; covers every worker when prometheus_multiproc_dir is set
+@app.get("/metrics", include_in_schema=False)
+@skip_middleware("session", "cookie_session", "rate_limit")
+async def metrics():
+    return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+
+# Probes: live while the process answers at all; ready once warm-up has finished, so the
+# load balancer only sends traffic to warm workers
+@app.get("/health/live", include_in_schema=False)
+@skip_middleware("session", "cookie_session", "rate_limit")
+async def health_live():
+    return {"status": "alive"}
+
+
+@app.get("/health/ready", include_in_schema=False)
+@skip_middleware("session", "cookie_session", "rate_limit")
+async def health_ready(response: Response):
+    if not readiness.ready:
+        response.status_code = 503
+    return readiness.report()
+
+
 @app.get("/error")
 async def generate_error():
     division_by_zero = 1 / 0
@@ -77,10 +58,8 @@ async def generate_error():
 
 app.include_router(api_router, prefix="/api/v1")
 
-app.add_middleware(
-    StarletteSessionMiddleware,
-    secret_key=settings.session_secret_key
-)
+# Metrics, tracing, CORS and sessions, in the order declared in src/middleware/pipeline.py
+install_middleware(app)
 
 
 if __name__ == "__main__":
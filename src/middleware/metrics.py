@@ -0,0 +1,54 @@
+import time
+from src.core.prometheus import (
+    QueryStats,
+    db_queries,
+    db_time,
+    http_in_progress,
+    http_latency,
+    http_requests,
+    method_label,
+    request_queries,
+    route_label,
+)
+
+
+class MetricsMiddleware:
+    """Request count, in-flight gauge and latency per route, plus the database work each request did.
+
+    Plain ASGI rather than BaseHTTPMiddleware, so measuring costs no extra task or body copy.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = method_label(scope["method"])
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        stats = QueryStats()
+        token = request_queries.set(stats)
+        # The route is only known once the router has matched, so the gauge is per method
+        in_progress = http_in_progress.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_progress.dec()
+            request_queries.reset(token)
+            route = route_label(scope)
+            http_requests.labels(method, route, str(status)).inc()
+            http_latency.labels(method, route).observe(elapsed)
+            db_queries.labels(route).observe(stats.count)
+            db_time.labels(route).observe(stats.seconds)
@@ -0,0 +1,139 @@
+"""The application's whole middleware stack, declared once, outermost layer first.
+
+Every layer is plain ASGI: none of them starts a task or buffers the response the way
+``@app.middleware("http")`` (BaseHTTPMiddleware) does. A route can skip named layers with
+``@skip_middleware(...)``; the lookup happens once per request, by matching the request
+against the app's routes the way the router does.
+
+Sentry is not listed: ``sentry_sdk.init`` wraps the app through its Starlette integration,
+and adding ``SentryAsgiMiddleware`` as well opened a second transaction per request.
+"""
+from dataclasses import dataclass, field
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from starlette.middleware.sessions import SessionMiddleware as CookieSessionMiddleware
+from starlette.routing import Match
+from src.core import telemetry
+from src.core.config.config import settings
+from src.middleware.metrics import MetricsMiddleware
+from src.middleware.session import RedisSessionMiddleware
+from src.security.limiter import limiter
+
+SKIP_ATTR = "__skip_middleware__"
+# Cached on the scope so each layer does not repeat the route lookup
+SCOPE_KEY = "fastgenapi.skip_middleware"
+# Docs routes are added by FastAPI itself, so they cannot be decorated
+DOCS_SKIP = frozenset({"session", "cookie_session"})
+
+
+@dataclass
+class Layer:
+    name: str
+    cls: type
+    options: dict = field(default_factory=dict)
+
+
+def layers():
+    """The pipeline, outermost first."""
+    stack = [
+        # Outermost, so its latency covers every other layer
+        Layer("metrics", MetricsMiddleware),
+    ]
+    if telemetry.tracer_provider is not None:
+        from opentelemetry.instrumentation.asgi import OpenTelemetryMiddleware
+
+        stack.append(Layer("tracing", OpenTelemetryMiddleware, telemetry.tracing_middleware_options(telemetry.tracer_provider)))
+    stack += [
+        # Answers preflight requests before any session work
+        Layer(
+            "cors",
+            CORSMiddleware,
+            {
+                "allow_origins": ["http://localhost", "http://localhost:3000", "http://localhost:8000"],
+                "allow_methods": ["GET", "POST"],
+                "allow_headers": ["*"],
+            },
+        ),
+        # Signed-cookie session Authlib keeps GitHub/Facebook OAuth state in
+        Layer("cookie_session", CookieSessionMiddleware, {"secret_key": settings.session_secret_key}),
+        # Server-side session in Redis, loaded lazily via Depends(get_session)
+        Layer("session", RedisSessionMiddleware),
+    ]
+    return stack
+
+
+def skip_middleware(*names: str):
+    """Route decorator: run the endpoint without the named layers.
+
+    "rate_limit" is accepted too and exempts the route from the limiter dependency::
+
+        @app.get("/health/live")
+        @skip_middleware("session", "cookie_session", "rate_limit")
+        async def live(): ...
+    """
+
+    def decorator(endpoint):
+        setattr(endpoint, SKIP_ATTR, frozenset(names))
+        if "rate_limit" in names:
+            limiter.exempt(endpoint)
+        return endpoint
+
+    return decorator
+
+
+class RouteOptOuts:
+    """Which layers a request skips, taken from the route the router will dispatch it to."""
+
+    def __init__(self, app: FastAPI):
+        self.app = app
+        self._routes = None
+
+    def _build(self):
+        docs = {self.app.docs_url, self.app.redoc_url, self.app.openapi_url, self.app.swagger_ui_oauth2_redirect_url}
+        routes = []
+        for route in self.app.routes:
+            skipped = getattr(getattr(route, "endpoint", None), SKIP_ATTR, None)
+            if skipped is None and getattr(route, "path", None) in docs:
+                skipped = DOCS_SKIP
+            routes.append((route, skipped or frozenset()))
+        self._routes = routes
+
+    def for_scope(self, scope):
+        skipped = scope.get(SCOPE_KEY)
+        if skipped is None:
+            if self._routes is None:
+                self._build()
+            skipped = frozenset()
+            # Same rule as the router: the first full match (path and method) handles the request
+            for route, names in self._routes:
+                if route.matches(scope)[0] is Match.FULL:
+                    skipped = names
+                    break
+            scope[SCOPE_KEY] = skipped
+        return skipped
+
+
+class SkippableLayer:
+    """Runs `middleware` unless the request's route opted out of it by name."""
+
+    def __init__(self, app, name: str, middleware: type, options: dict, opt_outs: RouteOptOuts):
+        self.app = app
+        self.name = name
+        self.layer = middleware(app, **options)
+        self.opt_outs = opt_outs
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and self.name in self.opt_outs.for_scope(scope):
+            await self.app(scope, receive, send)
+        else:
+            await self.layer(scope, receive, send)
+
+
+def install_middleware(app: FastAPI, stack=None):
+    """Replace whatever middleware `app` has with the declared pipeline."""
+    opt_outs = RouteOptOuts(app)
+    app.user_middleware.clear()
+    # add_middleware puts each new layer outermost, so add them innermost first
+    for layer in reversed(stack if stack is not None else layers()):
+        app.add_middleware(SkippableLayer, name=layer.name, middleware=layer.cls, options=layer.options, opt_outs=opt_outs)
+    return opt_outs
@@ -1,13 +1,29 @@
-from fastapi import Request, HTTPException
-from src.core.config.config import settings
-import jwt
-
-def role_required(role: str):
-    def role_checker(request: Request):
-        token = request.headers.get("Authorization").split(" ")[1]
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        user_roles = payload.get("roles", [])
-        if role not in user_roles:
+from fastapi import Depends, HTTPException
+from fastapi.security import OAuth2PasswordBearer
+from jose import JWTError
+from src.auth.auth import has_role
+from src.auth.token_cache import token_cache
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/login")
+
+
+# async, so FastAPI runs them on the event loop: token_cache is not safe to share across threadpool workers
+async def current_user(token: str = Depends(oauth2_scheme)):
+    try:
+        payload = token_cache.decode(token)
+    except JWTError:
+        raise HTTPException(status_code=403, detail="Invalid token")
+    if payload.get("sub") is None:
+        raise HTTPException(status_code=403, detail="Invalid token")
+    return payload
+
+
+def require_role(role: str):
+    async def role_checker(user: dict = Depends(current_user)):
+        if not has_role(user, role):
             raise HTTPException(status_code=403, detail="Permission denied")
-        return True
+        return user
     return role_checker
+
+
+role_required = require_role
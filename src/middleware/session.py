@@ -0,0 +1,381 @@
+import asyncio
+import logging
+import time
+import uuid
+import zlib
+import orjson
+from http.cookies import SimpleCookie
+from fastapi import FastAPI, HTTPException, Request
+from opentelemetry.metrics import Observation
+from redis.client import NEVER_DECODE
+from redis.exceptions import RedisError
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from src.core.config.config import settings
+from src.core.metrics import meter
+from src.redis_client import redis_conn
+
+# Marks zlib-compressed payloads; plain ones are JSON and always start with "{"
+COMPACT_PREFIX = b"z"
+
+
+def encode_payload(data: dict, compact: bool = False) -> bytes:
+    raw = orjson.dumps(data)
+    return COMPACT_PREFIX + zlib.compress(raw) if compact else raw
+
+
+def decode_payload(raw: bytes) -> dict:
+    # Both encodings are always readable, so session_encoding can change without logging anyone out
+    if raw[:1] == COMPACT_PREFIX:
+        raw = zlib.decompress(raw[1:])
+    return orjson.loads(raw)
+
+
+def _created_at(session_id: str):
+    _, separator, stamp = session_id.rpartition(".")
+    if not separator:
+        return None  # ids issued before creation time was recorded
+    try:
+        return int(stamp, 16)
+    except ValueError:
+        return None
+
+
+class SessionStore:
+    """Payloads in Redis under ``prefix`` that always expire.
+
+    Entries live ``idle_ttl`` seconds past their last use and, when ``absolute_ttl`` is set, never
+    longer than that after creation.
+    """
+
+    def __init__(self, prefix: str, idle_ttl: int, absolute_ttl: int = None, compact: bool = False):
+        self.prefix = prefix
+        self.idle_ttl = idle_ttl
+        self.absolute_ttl = absolute_ttl
+        self.compact = compact
+
+    def key(self, session_id: str):
+        return f"{self.prefix}{session_id}"
+
+    def new_id(self):
+        # Creation time rides in the id, so enforcing the absolute lifetime needs no extra field
+        return f"{uuid.uuid4().hex}.{int(time.time()):x}"
+
+    def needs_new_id(self, session_id: str):
+        # Ids issued before creation time was recorded would otherwise never hit the absolute cap
+        return bool(self.absolute_ttl) and _created_at(session_id) is None
+
+    def ttl_for(self, session_id: str):
+        ttl = self.idle_ttl
+        created = _created_at(session_id)
+        if self.absolute_ttl and created is not None:
+            ttl = min(ttl, int(created + self.absolute_ttl - time.time()))
+        return ttl
+
+    async def get(self, session_id: str):
+        if self.ttl_for(session_id) <= 0:
+            return None
+        redis = await redis_conn.get_redis()
+        raw = await redis.execute_command("GET", self.key(session_id), **{NEVER_DECODE: True})
+        return decode_payload(raw) if raw is not None else None
+
+    async def set(self, session_id: str, data: dict):
+        ttl = self.ttl_for(session_id)
+        if ttl <= 0:
+            await self.delete(session_id)
+            return
+        redis = await redis_conn.get_redis()
+        await redis.set(self.key(session_id), encode_payload(data, self.compact), ex=ttl)
+
+    async def touch(self, session_id: str):
+        # Sliding expiry: push the TTL out without rewriting the payload
+        ttl = self.ttl_for(session_id)
+        if ttl <= 0:
+            await self.delete(session_id)
+            return
+        redis = await redis_conn.get_redis()
+        await redis.expire(self.key(session_id), ttl)
+
+    async def delete(self, session_id: str):
+        redis = await redis_conn.get_redis()
+        await redis.delete(self.key(session_id))
+
+    async def pop(self, session_id: str):
+        """Read and delete in one step, for single-use entries such as OAuth state."""
+        redis = await redis_conn.get_redis()
+        raw = await redis.execute_command("GETDEL", self.key(session_id), **{NEVER_DECODE: True})
+        return decode_payload(raw) if raw is not None else None
+
+
+session_store = SessionStore(
+    "session:",
+    idle_ttl=settings.session_ttl_seconds,
+    absolute_ttl=settings.session_absolute_ttl_seconds,
+    compact=settings.session_encoding == "compact",
+)
+
+# state/nonce between the OAuth redirect and its callback; consumed once
+oauth_state_store = SessionStore("oauth:state:", idle_ttl=settings.oauth_state_ttl_seconds)
+
+
+class RedisSession(dict):
+    """Session payload that is read from Redis on first use and written back only when changed.
+
+    Reading or writing it before ``load()`` raises RuntimeError.
+    """
+
+    def __init__(self, session_id: str = None, store: SessionStore = session_store):
+        super().__init__()
+        self.session_id = session_id
+        self.store = store
+        self.loaded = False
+        self.exists = False
+        self.modified = False
+
+    async def load(self):
+        if self.loaded:
+            return self
+        self.loaded = True
+        if self.session_id:
+            data = await self.store.get(self.session_id)
+            if data:
+                super().update(data)
+                self.exists = True
+        return self
+
+    async def save(self):
+        if self.exists and self.store.needs_new_id(self.session_id):
+            # Move the payload to a timestamped id; the middleware sends the new cookie
+            old_id, self.session_id = self.session_id, self.store.new_id()
+            if self:
+                await self.store.set(self.session_id, dict(self))
+            else:
+                self.session_id = None
+            await self.store.delete(old_id)
+            return
+        if self.modified:
+            if self:
+                self.session_id = self.session_id if self.exists else self.store.new_id()
+                await self.store.set(self.session_id, dict(self))
+            elif self.exists:
+                await self.store.delete(self.session_id)
+        elif self.exists:
+            await self.store.touch(self.session_id)
+
+    def _mutate(self):
+        self._require_loaded()
+        self.modified = True
+
+    def _require_loaded(self):
+        # Until load() the payload is unknown: reads would see nothing and writes would never be saved
+        if not self.loaded:
+            raise RuntimeError("Session is not loaded; use Depends(get_session) to access it")
+
+    def __getitem__(self, key):
+        self._require_loaded()
+        return super().__getitem__(key)
+
+    def __contains__(self, key):
+        self._require_loaded()
+        return super().__contains__(key)
+
+    def get(self, key, default=None):
+        self._require_loaded()
+        return super().get(key, default)
+
+    def __setitem__(self, key, value):
+        self._mutate()
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._mutate()
+        super().__delitem__(key)
+
+    def clear(self):
+        self._mutate()
+        super().clear()
+
+    def pop(self, *args):
+        self._mutate()
+        return super().pop(*args)
+
+    def popitem(self):
+        self._mutate()
+        return super().popitem()
+
+    def setdefault(self, key, default=None):
+        self._require_loaded()
+        if key not in self:
+            self.modified = True
+        return super().setdefault(key, default)
+
+    def update(self, *args, **kwargs):
+        self._mutate()
+        super().update(*args, **kwargs)
+
+
+async def get_session(request: Request) -> RedisSession:
+    """Dependency returning the request session, loading it from Redis on first use."""
+    session = getattr(request.state, "session", None)
+    if session is None:
+        session = request.state.session = RedisSession(request.cookies.get(settings.session_cookie_name))
+    return await session.load()
+
+
+class RedisSessionMiddleware:
+    """Attaches a lazy RedisSession to each request and persists it once the response starts.
+
+    Plain ASGI, so requests pay no extra task or response buffering for it; sessions that are
+    never loaded cost no Redis round trip either.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        session_id = HTTPConnection(scope).cookies.get(settings.session_cookie_name)
+        session = scope.setdefault("state", {})["session"] = RedisSession(session_id)
+
+        async def send_with_session(message):
+            # Untouched sessions cost no Redis round trip
+            if message["type"] == "http.response.start" and session.loaded:
+                await session.save()
+                if session.session_id and session.session_id != session_id:
+                    MutableHeaders(scope=message).append("set-cookie", _session_cookie(session.session_id))
+            await send(message)
+
+        await self.app(scope, receive, send_with_session)
+
+
+def _session_cookie(session_id: str):
+    cookie = SimpleCookie()
+    name = settings.session_cookie_name
+    cookie[name] = session_id
+    cookie[name]["max-age"] = settings.session_absolute_ttl_seconds
+    cookie[name]["path"] = "/"
+    cookie[name]["httponly"] = True
+    cookie[name]["samesite"] = "lax"
+    return cookie.output(header="").strip()
+
+
+def add_session_middleware(app: FastAPI):
+    # For standalone apps; the main app gets it from src.middleware.pipeline
+    app.add_middleware(RedisSessionMiddleware)
+
+
+class SessionSweeper:
+    """Background task reporting key count and memory per store, and expiring keys left without a TTL."""
+
+    # MEMORY USAGE is sampled on this many keys per store and extrapolated
+    memory_sample_size = 100
+
+    def __init__(self, stores, interval: int, lock_key: str = "sweeper:sessions:lock"):
+        self.stores = stores
+        self.interval = interval
+        # Outside every store's prefix, so sweeps never count it
+        self.lock_key = lock_key
+        self.stats = {}
+        self._task = None
+        meter.create_observable_gauge(
+            "sessions.keys",
+            callbacks=[lambda options: self._observe("keys")],
+            description="Session and OAuth state keys in Redis",
+        )
+        meter.create_observable_gauge(
+            "sessions.memory",
+            callbacks=[lambda options: self._observe("memory_bytes")],
+            unit="By",
+            description="Estimated Redis memory used by session keys",
+        )
+
+    def _observe(self, field):
+        return [
+            Observation(stats[field], {"store": prefix})
+            for prefix, stats in self.stats.items()
+            if stats.get(field) is not None
+        ]
+
+    async def sweep(self):
+        redis = await redis_conn.get_redis()
+        for store in self.stores:
+            keys, repaired, sampled, memory = 0, 0, 0, 0
+            batch = []
+            async for key in redis.scan_iter(match=f"{store.prefix}*", count=1000):
+                batch.append(key)
+                if len(batch) == 1000:
+                    repaired += await self._expire_persistent(redis, store, batch)
+                    keys += len(batch)
+                    batch = []
+            repaired += await self._expire_persistent(redis, store, batch)
+            keys += len(batch)
+
+            try:
+                async for key in redis.scan_iter(match=f"{store.prefix}*", count=self.memory_sample_size):
+                    memory += await redis.memory_usage(key) or 0
+                    sampled += 1
+                    if sampled == self.memory_sample_size:
+                        break
+            except RedisError:
+                sampled = 0  # MEMORY USAGE unavailable (e.g. managed Redis with it disabled)
+
+            self.stats[store.prefix] = {
+                "keys": keys,
+                "repaired": repaired,
+                "memory_bytes": memory * keys // sampled if sampled else None,
+            }
+        return self.stats
+
+    async def _expire_persistent(self, redis, store, keys):
+        if not keys:
+            return 0
+        async with redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.ttl(key)
+            ttls = await pipe.execute()
+        # -1: written without expiry, e.g. OAuth state from before stores had TTLs
+        persistent = [key for key, ttl in zip(keys, ttls) if ttl == -1]
+        if persistent:
+            async with redis.pipeline(transaction=False) as pipe:
+                for key in persistent:
+                    pipe.expire(key, store.idle_ttl)
+                await pipe.execute()
+        return len(persistent)
+
+    async def sweep_if_due(self):
+        """Sweep unless another process already has this interval; True if this one swept."""
+        redis = await redis_conn.get_redis()
+        # Held for the whole interval rather than released, so one process sweeps per interval
+        if not await redis.set(self.lock_key, "1", nx=True, ex=self.interval):
+            # Only the process that swept reports, so summing the gauges does not multiply them
+            self.stats = {}
+            return False
+        await self.sweep()
+        return True
+
+    async def run(self):
+        while True:
+            try:
+                await self.sweep_if_due()
+            except (RedisError, HTTPException) as exc:
+                logging.warning("Session sweep failed: %s", exc)
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+session_sweeper = SessionSweeper([session_store, oauth_state_store], settings.session_sweep_interval_seconds)
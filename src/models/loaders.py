@@ -0,0 +1,47 @@
+import typing
+from functools import lru_cache
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, selectinload
+
+LOADERS = {"selectin": selectinload, "joined": joinedload}
+
+
+def _nested_schema(annotation):
+    """Find the Pydantic model inside annotations such as list[ItemModel] or Optional[UserModel]."""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in typing.get_args(annotation):
+        schema = _nested_schema(arg)
+        if schema is not None:
+            return schema
+    return None
+
+
+@lru_cache(maxsize=None)
+def loader_options(model, schema, _seen=frozenset()):
+    """Eager-load options for every relationship of `model` that `schema` serializes.
+
+    Collections default to selectinload (one extra query per relationship, no row
+    multiplication) and many-to-one to joinedload. A schema can override this per
+    field with `__loader_strategies__ = {"items": "joined"}`.
+    """
+    seen = _seen | {(model, schema)}
+    relationships = inspect(model).relationships
+    strategies = getattr(schema, "__loader_strategies__", {})
+    options = []
+    for name, field in schema.model_fields.items():
+        if name not in relationships:
+            continue
+        relationship = relationships[name]
+        default = "selectin" if relationship.uselist else "joined"
+        loader = LOADERS[strategies.get(name, default)](getattr(model, name))
+
+        nested = _nested_schema(field.annotation)
+        target = relationship.mapper.class_
+        if nested is not None and (target, nested) not in seen:
+            nested_options = loader_options(target, nested, seen)
+            if nested_options:
+                loader = loader.options(*nested_options)
+        options.append(loader)
+    return tuple(options)
@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, String, Boolean
+from sqlalchemy import Column, Integer, String, Boolean, literal_column
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from src.core.config.config import settings
-from sqlalchemy import Column, Integer, String, ForeignKey, Table
+from src.models.pool_stats import pool_stats, TimedAsyncQueuePool
+from src.core.prometheus import instrument_engine
+from sqlalchemy import Column, Integer, String, ForeignKey, Table, Index
 from sqlalchemy.orm import relationship
 from pydantic import BaseModel
 
@@ -20,16 +24,24 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True)
     hashed_password = Column(String)
+    # Bumped by every UPDATE, ORM flush or Core statement alike; feeds ETags without reading
+    # the row's payload. Not a version_id_col: concurrent writers must not fail with StaleDataError.
+    version_id = Column(Integer, nullable=False, default=1, server_default='1', onupdate=literal_column('version_id') + 1)
     items = relationship('Item', back_populates='owner')
     roles = relationship('Role', secondary=user_roles, back_populates='users')
 
+
 class Item(Base):
     __tablename__ = 'items'
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String)
     owner_id = Column(Integer, ForeignKey('users.id'))
+    version_id = Column(Integer, nullable=False, default=1, server_default='1', onupdate=literal_column('version_id') + 1)
     owner = relationship('User', back_populates='items')
 
+    # Serves owner_id filters ordered by id (keyset pagination)
+    __table_args__ = (Index('ix_items_owner_id_id', 'owner_id', 'id'),)
+
 
 class Role(Base):
     __tablename__ = 'roles'
@@ -37,9 +49,62 @@ class Role(Base):
     name = Column(String, unique=True, index=True)
     users = relationship('User', secondary=user_roles, back_populates='roles')  
 
-engine = create_engine(settings.database_url)
+# Async drivers used when database_url names a blocking one
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+
+def get_async_database_url(database_url: str):
+    """Return database_url with its driver swapped for the async equivalent."""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if url.get_dialect().is_async or backend not in ASYNC_DRIVERS:
+        return url
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+def get_engine_options(database_url):
+    """Pool options from Settings.
+
+    SQLite keeps the pool SQLAlchemy picks for its URL: QueuePool for a file with the blocking
+    driver, NullPool for a file with aiosqlite, and a single shared connection for in-memory
+    databases. Only QueuePool takes the size options, so none are passed.
+    """
+    options = {
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_recycle": settings.db_pool_recycle,
+    }
+    if make_url(database_url).get_backend_name() != "sqlite":
+        options.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+        )
+    return options
+
+
+# Blocking engine, kept for Alembic and scripts
+engine = create_engine(settings.database_url, **get_engine_options(settings.database_url))
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-def init_db():
-    Base.metadata.create_all(bind=engine)
+# Engine used by the application
+async_engine_options = get_engine_options(settings.database_url)
+if "pool_size" in async_engine_options:
+    async_engine_options["poolclass"] = TimedAsyncQueuePool
+async_engine = create_async_engine(get_async_database_url(settings.database_url), **async_engine_options)
+pool_stats.bind(async_engine)
+instrument_engine(async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+async def init_db():
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
@@ -0,0 +1,67 @@
+import time
+from opentelemetry.metrics import Observation
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from src.core.metrics import meter, Histogram
+
+
+class PoolStats:
+    """Connection pool usage for an engine, readable in-process and as OTel metrics."""
+
+    def __init__(self, engine=None):
+        self.engine = engine
+        self.wait_time = Histogram(
+            "db.pool.wait_time",
+            description="Time spent waiting to check out a pooled connection",
+        )
+        meter.create_observable_gauge(
+            "db.pool.checked_out",
+            callbacks=[lambda options: self._observe("checked_out")],
+            description="Connections currently checked out of the pool",
+        )
+        meter.create_observable_gauge(
+            "db.pool.overflow",
+            callbacks=[lambda options: self._observe("overflow")],
+            description="Connections open beyond pool_size",
+        )
+
+    def bind(self, engine):
+        self.engine = engine
+
+    @property
+    def pool(self):
+        return self.engine.sync_engine.pool
+
+    def observe_wait(self, seconds: float):
+        self.wait_time.observe(seconds)
+
+    def _observe(self, field):
+        value = self.snapshot().get(field)
+        return [Observation(value)] if value is not None else []
+
+    def snapshot(self):
+        stats = {"pool": type(self.pool).__name__}
+        # NullPool/StaticPool (SQLite) keep no counters
+        if isinstance(self.pool, QueuePool):
+            stats.update(
+                size=self.pool.size(),
+                checked_in=self.pool.checkedin(),
+                checked_out=self.pool.checkedout(),
+                overflow=max(self.pool.overflow(), 0),
+                timeout=self.pool.timeout(),
+            )
+        stats["wait_time"] = self.wait_time.snapshot()
+        return stats
+
+
+pool_stats = PoolStats()
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited, only when a connection is actually needed."""
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            pool_stats.observe_wait(time.perf_counter() - started)
@@ -1,7 +1,11 @@
+from typing import Generic, Optional, TypeVar
 from pydantic import BaseModel
 
+T = TypeVar("T")
+
 # Pydantic model for Item
 class ItemModel(BaseModel):
+    id: Optional[int] = None
     name: str
     owner_id: int
 
@@ -10,8 +14,21 @@ class ItemModel(BaseModel):
 
 # Pydantic model for User
 class UserModel(BaseModel):
+    id: Optional[int] = None
     email: str
     items: list[ItemModel] = []
 
     class Config:
         from_attributes = True
+
+# Login projection of a User with role names, safe to cache
+class UserCredentials(BaseModel):
+    id: int
+    email: str
+    hashed_password: str
+    roles: list[str] = []
+
+# One page of a keyset-paginated listing; pass next_cursor as `after` to continue
+class Page(BaseModel, Generic[T]):
+    items: list[T]
+    next_cursor: Optional[int] = None
@@ -0,0 +1,74 @@
+from fastapi import HTTPException
+import logging
+import time
+from redis.asyncio import BlockingConnectionPool, Redis
+from redis.asyncio.client import Pipeline
+from redis.asyncio.retry import Retry
+from redis.backoff import ExponentialBackoff
+from redis.exceptions import ConnectionError, TimeoutError
+from src.core.config.config import settings
+from src.core.prometheus import observe_redis
+
+
+class TimedRedis(Redis):
+    """Redis client that records each command's round trip; a pipeline counts as one."""
+
+    async def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            observe_redis(args[0], time.perf_counter() - started)
+
+    def pipeline(self, transaction: bool = True, shard_hint=None):
+        return TimedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+class TimedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        started = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            observe_redis("PIPELINE", time.perf_counter() - started)
+
+
+# Redis Dependency Class
+# Single pooled client shared by sessions, OAuth state and rate limiting.
+# Lives outside src/redis.py so it does not shadow redis-py when src/ is on sys.path.
+class RedisConnection:
+    def __init__(self):
+        self.redis_pool = None
+
+    async def initialize(self):
+        if self.redis_pool is not None:
+            return
+        pool = BlockingConnectionPool.from_url(
+            f"redis://{settings.redis_host}:{settings.redis_port}",
+            max_connections=settings.redis_max_connections,
+            timeout=settings.redis_pool_timeout,
+            socket_timeout=settings.redis_socket_timeout,
+            socket_connect_timeout=settings.redis_socket_timeout,
+            health_check_interval=settings.redis_health_check_interval,
+            # Reconnect with exponential backoff on dropped or timed out connections
+            retry=Retry(ExponentialBackoff(cap=2, base=0.05), settings.redis_retry_attempts),
+            retry_on_error=[ConnectionError, TimeoutError],
+            decode_responses=True,
+        )
+        self.redis_pool = TimedRedis(connection_pool=pool)
+        logging.info("Redis connection initialized")
+
+    async def close(self):
+        if self.redis_pool is None:
+            return
+        await self.redis_pool.aclose(close_connection_pool=True)
+        self.redis_pool = None
+        logging.info("Redis connection closed")
+
+    async def get_redis(self):
+        if self.redis_pool is None:
+            raise HTTPException(status_code=503, detail="Redis connection not initialized")
+        return self.redis_pool
+
+# Global instance of RedisConnection
+redis_conn = RedisConnection()
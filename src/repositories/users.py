@@ -0,0 +1,105 @@
+import logging
+from fastapi import Depends, HTTPException
+from redis.exceptions import RedisError
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.api.v1.utils import get_db
+from src.auth.auth import verify_and_update_password_async
+from src.core.cache import LRUCache
+from src.core.config.config import settings
+from src.models.models import User, Role, user_roles
+from src.models.pydanticModels import UserCredentials
+from src.redis_client import redis_conn
+
+# Per-process tier in front of Redis; kept short because other workers' writes
+# only invalidate Redis and their own process
+local_user_cache = LRUCache(maxsize=settings.user_cache_size, ttl=settings.user_cache_local_ttl_seconds)
+
+
+def _cache_key(email: str):
+    return f"user:credentials:{email}"
+
+
+class UserRepository:
+    """Users and their roles, with the login projection cached in-process and in Redis."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_credentials(self, email: str):
+        cached = local_user_cache.get(email)
+        if cached is not None:
+            return cached
+
+        raw = await self._redis_call("get", _cache_key(email))
+        if raw:
+            credentials = UserCredentials.model_validate_json(raw)
+            local_user_cache.set(email, credentials)
+            return credentials
+
+        credentials = await self._load_credentials(email)
+        if credentials is not None:
+            local_user_cache.set(email, credentials)
+            await self._redis_call(
+                "set", _cache_key(email), credentials.model_dump_json(), ex=settings.user_cache_ttl_seconds
+            )
+        return credentials
+
+    async def _load_credentials(self, email: str):
+        # One round trip: the user row joined to its role names through user_roles
+        result = await self.db.execute(
+            select(User.id, User.email, User.hashed_password, Role.name)
+            .select_from(User)
+            .outerjoin(user_roles, user_roles.c.user_id == User.id)
+            .outerjoin(Role, Role.id == user_roles.c.role_id)
+            .where(User.email == email)
+        )
+        rows = result.all()
+        if not rows:
+            return None
+        user_id, user_email, hashed_password, _ = rows[0]
+        return UserCredentials(
+            id=user_id,
+            email=user_email,
+            hashed_password=hashed_password or "",
+            roles=[role for *_, role in rows if role is not None],
+        )
+
+    async def authenticate(self, email: str, password: str):
+        credentials = await self.get_credentials(email)
+        if credentials is None or not credentials.hashed_password:
+            return None
+        valid, new_hash = await verify_and_update_password_async(password, credentials.hashed_password)
+        if not valid:
+            return None
+        if new_hash:
+            # Stored hash predates the current work factor
+            await self.db.execute(update(User).where(User.id == credentials.id).values(hashed_password=new_hash))
+            await self.db.commit()
+            await self.invalidate(email)
+            credentials = credentials.model_copy(update={"hashed_password": new_hash})
+        return credentials
+
+    async def create(self, email: str, hashed_password: str, roles: list = None):
+        user = User(email=email, hashed_password=hashed_password, items=[], roles=roles or [])
+        self.db.add(user)
+        await self.db.commit()
+        await self.invalidate(email)
+        return user
+
+    async def invalidate(self, email: str):
+        local_user_cache.delete(email)
+        await self._redis_call("delete", _cache_key(email))
+
+    async def _redis_call(self, command: str, *args, **kwargs):
+        # The cache is an optimisation: fall back to the database if Redis is unavailable
+        try:
+            redis = await redis_conn.get_redis()
+            return await getattr(redis, command)(*args, **kwargs)
+        except (RedisError, HTTPException) as exc:
+            logging.warning("User cache %s failed: %s", command, exc)
+            return None
+
+
+def get_user_repository(db: AsyncSession = Depends(get_db)):
+    return UserRepository(db)
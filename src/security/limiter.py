@@ -1,4 +1,164 @@
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+import hashlib
+import logging
+import math
+import time
+from fastapi import HTTPException, Request, Response
+from jose import JWTError
+from limits import parse
+from redis.exceptions import RedisError
+from src.auth.token_cache import token_cache
+from src.core.cache import LRUCache
+from src.core.config.config import settings
+from src.core.http_client import CircuitBreaker
+from src.redis_client import redis_conn
 
-limiter = Limiter(key_func=get_remote_address)
+# GCRA: each key stores its theoretical arrival time (TAT) in ms, so a check is one
+# atomic read-modify-write. Redis' clock is used so every worker agrees on "now".
+GCRA_SCRIPT = """
+local period = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = clock[1] * 1000 + clock[2] / 1000
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+local new_tat = tat + interval
+local allowed_from = new_tat - period
+if now < allowed_from then
+    return {0, 0, math.ceil(allowed_from - now), math.ceil(tat - now)}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil(new_tat - now))
+return {1, math.floor((now - allowed_from) / interval), 0, math.ceil(new_tat - now)}
+"""
+
+_EXEMPT = object()
+
+
+class TokenBucket:
+    """Per-process fallback used while Redis is unreachable."""
+
+    def __init__(self, capacity: int, period: float):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def take(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True, int(self.tokens), 0
+        return False, 0, math.ceil((1 - self.tokens) / self.rate * 1000)
+
+
+def client_ip(request: Request):
+    return request.client.host if request.client and request.client.host else "127.0.0.1"
+
+
+def identity(request: Request):
+    """A known API key if one is sent, else the bearer token's subject, else the client address."""
+    api_key = request.headers.get("X-API-Key")
+    if api_key:
+        # Keys are secrets; only a digest is configured or ends up in Redis key names.
+        # Unknown keys are ignored, or a new header per request would get a new bucket.
+        digest = hashlib.sha256(api_key.encode()).hexdigest()
+        if digest in settings.api_key_digests:
+            return f"key:{digest[:16]}"
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            subject = token_cache.decode(token).get("sub")
+            if subject:
+                return f"user:{subject}"
+        except JWTError:
+            pass
+    return f"ip:{client_ip(request)}"
+
+
+class Limiter:
+    """Cluster-wide rate limiter: GCRA in Redis, one EVALSHA per request.
+
+    ``default`` applies to every route unless it declares its own policy with ``@limiter.limit``
+    or opts out with ``@limiter.exempt``.
+    """
+
+    def __init__(self, default: str, key_func=identity, enabled: bool = True):
+        self.default = parse(default)
+        self.key_func = key_func
+        self.enabled = enabled
+        self._script = None
+        # Open after one failure: during an outage requests go straight to the local buckets
+        # instead of each waiting for Redis to fail again; one trial call per retry window
+        self._redis = CircuitBreaker(failure_threshold=1, reset_timeout=settings.rate_limit_redis_retry_seconds)
+        self._buckets = LRUCache(maxsize=10000, ttl=self.default.get_expiry())
+
+    def limit(self, rate: str, key_func=None):
+        def decorator(endpoint):
+            endpoint.__rate_limit__ = (parse(rate), key_func)
+            return endpoint
+
+        return decorator
+
+    def exempt(self, endpoint):
+        endpoint.__rate_limit__ = _EXEMPT
+        return endpoint
+
+    async def __call__(self, request: Request, response: Response):
+        if not self.enabled:
+            return
+        route = request.scope.get("route")
+        policy = getattr(getattr(route, "endpoint", None), "__rate_limit__", None)
+        if policy is _EXEMPT:
+            return
+        if policy is None:
+            rate, key_func, scope = self.default, self.key_func, "default"
+        else:
+            rate, key_func = policy
+            key_func, scope = key_func or self.key_func, route.path
+
+        key = f"ratelimit:{scope}:{key_func(request)}"
+        allowed, remaining, retry_after_ms, reset_ms = await self.hit(key, rate)
+        headers = {
+            "X-RateLimit-Limit": str(rate.amount),
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset": str(math.ceil(reset_ms / 1000)),
+        }
+        if not allowed:
+            headers["Retry-After"] = str(math.ceil(retry_after_ms / 1000))
+            raise HTTPException(status_code=429, detail="Rate limit exceeded", headers=headers)
+        response.headers.update(headers)
+
+    async def hit(self, key: str, rate):
+        period_ms = rate.get_expiry() * 1000
+        if not self._redis.allow():
+            return self._local_hit(key, rate)
+        try:
+            redis = await redis_conn.get_redis()
+            if self._script is None:
+                self._script = redis.register_script(GCRA_SCRIPT)
+            allowed, remaining, retry_after_ms, reset_ms = await self._script(
+                keys=[key], args=[period_ms, period_ms / rate.amount], client=redis
+            )
+        except (RedisError, HTTPException) as exc:
+            # Logged when the limiter switches over, not on every failed trial during an outage
+            if not self._redis.failures:
+                logging.warning("Rate limiter falling back to local buckets: %s", exc)
+            self._redis.record_failure()
+            return self._local_hit(key, rate)
+        if self._redis.failures:
+            logging.info("Rate limiter back on Redis")
+        self._redis.record_success()
+        return bool(allowed), remaining, retry_after_ms, reset_ms
+
+    def _local_hit(self, key: str, rate):
+        bucket = self._buckets.get(key) or TokenBucket(rate.amount, rate.get_expiry())
+        # An idle bucket is full again after one period, so it can be dropped then
+        self._buckets.set(key, bucket, ttl=rate.get_expiry())
+        allowed, remaining, retry_after_ms = bucket.take()
+        return allowed, remaining, retry_after_ms, retry_after_ms
+
+
+limiter = Limiter(default=settings.rate_limit, enabled=settings.rate_limit_enabled)
@@ -43,4 +43,5 @@ def setup_plantuml():
         except Exception as e:
             typer.secho(f"An unexpected error occurred: {e}", fg="red")
 
-setup_plantuml()
+if __name__ == "__main__":
+    setup_plantuml()
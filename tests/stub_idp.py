@@ -0,0 +1,91 @@
+"""Offline stand-in for the Google, GitHub and Facebook OAuth endpoints.
+
+Clients reach it through ``httpx.ASGITransport``, so tests never touch the network::
+
+    stub = StubIdP()
+    oauth = stub.oauth()  # registry with google/github/facebook pointed at the stub
+"""
+import time
+import httpx
+from authlib.integrations.starlette_client import OAuth
+from authlib.jose import JsonWebKey, jwt
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+BASE_URL = "https://idp.test"
+
+
+class StubIdP:
+    def __init__(self, max_age: int = 300):
+        self.max_age = max_age
+        self.key = JsonWebKey.generate_key("RSA", 2048, is_private=True, options={"kid": "stub"})
+        self.requests = []
+        self.metadata_urls = {"google": f"{BASE_URL}/google/.well-known/openid-configuration"}
+        self.app = self._build_app()
+
+    def _build_app(self):
+        app = FastAPI()
+
+        @app.middleware("http")
+        async def record(request: Request, call_next):
+            self.requests.append(request.url.path)
+            return await call_next(request)
+
+        @app.get("/google/.well-known/openid-configuration")
+        async def discovery():
+            return self._cacheable({
+                "issuer": BASE_URL,
+                "authorization_endpoint": f"{BASE_URL}/google/authorize",
+                "token_endpoint": f"{BASE_URL}/google/token",
+                "userinfo_endpoint": f"{BASE_URL}/google/userinfo",
+                "jwks_uri": f"{BASE_URL}/google/jwks",
+                "id_token_signing_alg_values_supported": ["RS256"],
+            })
+
+        @app.get("/google/jwks")
+        async def jwks():
+            return self._cacheable({"keys": [self.key.as_dict(is_private=False)]})
+
+        @app.post("/github/token")
+        @app.post("/facebook/token")
+        async def token():
+            return {"access_token": "stub-access-token", "token_type": "bearer"}
+
+        @app.get("/github/user")
+        async def github_user():
+            return {"login": "stub", "email": "stub@example.com"}
+
+        @app.get("/facebook/me")
+        async def facebook_user():
+            return {"id": "1", "email": "stub@example.com"}
+
+        return app
+
+    def _cacheable(self, content):
+        return JSONResponse(content, headers={"Cache-Control": f"public, max-age={self.max_age}"})
+
+    def id_token(self, client_id: str, nonce: str, **claims):
+        now = int(time.time())
+        payload = {"iss": BASE_URL, "sub": "stub", "aud": client_id, "nonce": nonce, "iat": now, "exp": now + 300}
+        return jwt.encode({"alg": "RS256", "kid": "stub"}, {**payload, **claims}, self.key).decode()
+
+    def oauth(self):
+        client_kwargs = {"transport": httpx.ASGITransport(app=self.app)}
+        oauth = OAuth()
+        oauth.register(
+            name="google",
+            client_id="google-client",
+            client_secret="secret",
+            server_metadata_url=self.metadata_urls["google"],
+            client_kwargs={"scope": "openid email profile", **client_kwargs},
+        )
+        for name in ("github", "facebook"):
+            oauth.register(
+                name=name,
+                client_id=f"{name}-client",
+                client_secret="secret",
+                authorize_url=f"{BASE_URL}/{name}/authorize",
+                access_token_url=f"{BASE_URL}/{name}/token",
+                client_kwargs=client_kwargs,
+            )
+        return oauth
@@ -0,0 +1,29 @@
+import asyncio
+from passlib.hash import bcrypt
+from src.auth import auth
+from src.auth.auth import get_password_hash, verify_and_update_password_async, verify_password_async
+
+
+def test_verify_password_async_runs_on_worker_pool():
+    hashed = get_password_hash("password1")
+
+    async def scenario():
+        assert await verify_password_async("password1", hashed)
+        assert not await verify_password_async("wrong", hashed)
+        assert auth.hash_queue_depth == 0
+
+    asyncio.run(scenario())
+    assert auth._hash_executor is not None
+
+
+def test_weak_hash_is_upgraded_on_verify():
+    weak = bcrypt.using(rounds=4).hash("password1")
+    valid, new_hash = asyncio.run(verify_and_update_password_async("password1", weak))
+    assert valid
+    assert new_hash is not None and not auth.pwd_context.needs_update(new_hash)
+
+
+def test_current_hash_is_not_rehashed():
+    hashed = get_password_hash("password1")
+    valid, new_hash = asyncio.run(verify_and_update_password_async("password1", hashed))
+    assert valid and new_hash is None
@@ -0,0 +1,25 @@
+from benchmarks.load import compare, summarize
+
+
+def report(rps, p95):
+    return {"results": {"root": {"rps": rps, "p95_ms": p95}}}
+
+
+def test_summarize_percentiles():
+    latencies = [n / 1000 for n in range(1, 101)]
+    summary = summarize(latencies, {200: 99, 500: 1}, elapsed=2.0)
+    assert summary["requests"] == 100
+    assert summary["errors"] == 1
+    assert summary["rps"] == 50.0
+    assert summary["p50_ms"] == 50.5
+    assert 95 <= summary["p95_ms"] <= 96
+    assert summary["statuses"] == {"200": 99, "500": 1}
+
+
+def test_compare_flags_regressions_beyond_tolerance():
+    baseline = report(rps=1000, p95=10)
+    assert compare(report(rps=950, p95=10.5), baseline, tolerance=0.10) == []
+    assert compare(report(rps=800, p95=10), baseline, tolerance=0.10) == ["root: 1000 -> 800 req/s"]
+    assert compare(report(rps=1000, p95=12), baseline, tolerance=0.10) == ["root: p95 10 -> 12 ms"]
+    # Scenarios missing from the baseline are not compared
+    assert compare({"results": {"login": {"rps": 1, "p95_ms": 1}}}, baseline, tolerance=0.10) == []
@@ -0,0 +1,98 @@
+import asyncio
+import uuid
+import pytest
+from sqlalchemy import select, update
+from fastapi.testclient import TestClient
+from src.api.v1.conditional import etag_matches, make_etag
+from src.main import app
+from src.core.response_cache import response_cache
+from src.models.models import AsyncSessionLocal, Item, User, init_db
+
+
+@pytest.fixture
+def user_id():
+    async def seed():
+        await init_db()
+        async with AsyncSessionLocal() as db:
+            user = User(email=f"etag-{uuid.uuid4().hex}@example.com", hashed_password="x", items=[Item(name="first")])
+            db.add(user)
+            await db.commit()
+            return user.id
+
+    response_cache.clear()
+    return asyncio.run(seed())
+
+
+def test_etag_matching():
+    etag = make_etag("user", 1, 1)
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", {etag.removeprefix("W/")}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_if_none_match_returns_304_without_loading_user(user_id, assert_query_count):
+    client = TestClient(app)
+    etag = client.get(f"/users/{user_id}").headers["ETag"]
+    response_cache.clear()
+
+    with assert_query_count(1):
+        response = client.get(f"/users/{user_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+
+def test_etag_changes_when_items_change(user_id):
+    client = TestClient(app)
+    etag = client.get(f"/users/{user_id}").headers["ETag"]
+
+    client.post("/items/", json={"name": "second", "owner_id": user_id})
+    response = client.get(f"/users/{user_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert len(response.json()["items"]) == 2
+
+
+def test_missing_user_still_404s():
+    response = TestClient(app).get("/users/999999")
+    assert response.status_code == 404
+    assert "ETag" not in response.headers
+
+
+def test_core_updates_bump_the_version(user_id):
+    async def rehash():
+        async with AsyncSessionLocal() as db:
+            await db.execute(update(User).where(User.id == user_id).values(hashed_password="y"))
+            await db.commit()
+            return await db.scalar(select(User.version_id).where(User.id == user_id))
+
+    assert asyncio.run(rehash()) == 2
+
+
+def test_concurrent_orm_updates_do_not_conflict(user_id):
+    async def write_twice():
+        async with AsyncSessionLocal() as first, AsyncSessionLocal() as second:
+            users = [await db.get(User, user_id) for db in (first, second)]
+            for db, user, name in zip((first, second), users, ("a", "b")):
+                user.email = f"{name}-{uuid.uuid4().hex}@example.com"
+                await db.commit()
+        async with AsyncSessionLocal() as db:
+            return await db.scalar(select(User.version_id).where(User.id == user_id))
+
+    assert asyncio.run(write_twice()) == 3
+
+
+def test_item_pages_answer_if_none_match(user_id):
+    client = TestClient(app)
+    params = {"owner_id": user_id}
+    etag = client.get("/api/v1/items", params=params).headers["ETag"]
+    assert client.get("/api/v1/items", params=params, headers={"If-None-Match": etag}).status_code == 304
+    # Another page of the same listing is a different representation
+    assert client.get("/api/v1/items", params={**params, "limit": 1}).headers["ETag"] != etag
+
+    client.post("/items/", json={"name": "second", "owner_id": user_id})
+    response = client.get("/api/v1/items", params=params, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 2
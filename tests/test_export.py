@@ -0,0 +1,46 @@
+import csv
+import io
+from datetime import timedelta
+import orjson
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.api.v1.endpoints import router
+from src.auth.auth import create_access_token
+from src.core.config.config import settings
+from src.models.models import Role, User
+
+app = FastAPI()
+app.include_router(router, prefix="/api/v1")
+client = TestClient(app)
+admin = {"Authorization": f"Bearer {create_access_token({'sub': 'admin', 'roles': ['admin']}, timedelta(minutes=5))}"}
+
+
+@pytest.fixture(scope="module", autouse=True)
+def seeded(isolated_db):
+    async def seed(db):
+        role = Role(name="exporter")
+        db.add_all(User(email=f"export{i}@example.com", hashed_password="secret", roles=[role]) for i in range(5))
+        await db.commit()
+
+    isolated_db.run(seed)
+
+
+def test_users_ndjson_streamed_in_batches(monkeypatch):
+    monkeypatch.setattr(settings, "export_batch_size", 2)
+    response = client.get("/api/v1/export/users", headers=admin)
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [orjson.loads(line) for line in response.content.splitlines()]
+    assert [row["email"] for row in rows] == [f"export{i}@example.com" for i in range(5)]
+    assert "hashed_password" not in rows[0]
+
+
+def test_user_roles_csv():
+    response = client.get("/api/v1/export/user_roles", params={"format": "csv"}, headers=admin)
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == ["user_id", "email", "role_id", "role"]
+    assert len(rows) == 6 and rows[1][3] == "exporter"
+
+
+def test_export_requires_admin():
+    assert client.get("/api/v1/export/items").status_code == 401
@@ -0,0 +1,86 @@
+import asyncio
+import httpx
+import pytest
+from authlib.integrations.starlette_client import OAuth
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse
+from src.core.config.config import settings
+from src.core.http_client import CircuitOpenError, OutboundHTTP
+from stub_idp import StubIdP
+
+broken = FastAPI()
+
+
+@broken.get("/user")
+async def failing_userinfo():
+    return JSONResponse({"error": "down"}, status_code=503)
+
+
+@pytest.fixture(scope="module")
+def stub():
+    return StubIdP()
+
+
+def test_userinfo_through_shared_client(stub):
+    outbound = OutboundHTTP(transport=httpx.ASGITransport(app=stub.app))
+
+    async def run():
+        response = await outbound.get("github", "https://idp.test/github/user", headers={"Authorization": "Bearer t"})
+        await outbound.close()
+        return response.json()
+
+    assert asyncio.run(run())["login"] == "stub"
+    assert outbound.latency.count == 1
+    assert outbound.stats()["providers"]["github"]["circuit"] == "closed"
+
+
+def test_authlib_clients_share_the_pool(stub):
+    outbound = OutboundHTTP(transport=httpx.ASGITransport(app=stub.app))
+    oauth = OAuth()
+    oauth.register(
+        name="github",
+        client_id="github-client",
+        client_secret="secret",
+        access_token_url="https://idp.test/github/token",
+        client_kwargs={"transport": outbound.transport_for("github")},
+    )
+
+    async def run():
+        # Authlib closes its per-call client; the shared pool must survive that
+        first = await oauth.github.fetch_access_token(code="one")
+        second = await oauth.github.fetch_access_token(code="two")
+        await outbound.close()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first["access_token"] == second["access_token"] == "stub-access-token"
+    assert outbound.latency.count == 2
+
+
+def test_circuit_opens_after_repeated_failures(monkeypatch):
+    monkeypatch.setattr(settings, "http_circuit_failure_threshold", 2)
+    outbound = OutboundHTTP(transport=httpx.ASGITransport(app=broken))
+
+    async def run():
+        statuses = [(await outbound.get("facebook", "https://idp.test/user")).status_code for _ in range(2)]
+        with pytest.raises(CircuitOpenError):
+            await outbound.get("facebook", "https://idp.test/user")
+        await outbound.close()
+        return statuses
+
+    assert asyncio.run(run()) == [503, 503]
+    assert outbound.stats()["providers"]["facebook"]["circuit"] == "open"
+    # Other providers are unaffected
+    assert outbound.breaker_for("github").allow()
+
+
+def test_fetch_userinfo_maps_open_circuit_to_503(monkeypatch):
+    from src.core import http_client as module
+
+    outbound = OutboundHTTP(transport=httpx.ASGITransport(app=broken))
+    outbound.breaker_for("facebook").opened_at = float("inf")
+    monkeypatch.setattr(module, "http_client", outbound)
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(module.fetch_userinfo("facebook", "https://idp.test/user", {"access_token": "t"}))
+    assert exc_info.value.status_code == 503
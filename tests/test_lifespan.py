@@ -0,0 +1,87 @@
+import asyncio
+import fakeredis.aioredis
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from src.core import lifespan
+from src.core.lifespan import readiness, warm_database
+from src.main import app
+from src.redis_client import redis_conn
+
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch):
+    # No Sentry client and no provider discovery requests
+    monkeypatch.setattr(lifespan, "init_sentry", lambda: None)
+    monkeypatch.setattr(lifespan.provider_metadata, "start", _noop)
+    monkeypatch.setattr(lifespan.settings, "warmup_retry_seconds", 0.05)
+
+
+async def _noop():
+    pass
+
+
+async def _use_fakeredis():
+    redis_conn.redis_pool = fakeredis.aioredis.FakeRedis(decode_responses=True)
+
+
+def test_ready_after_warm_up_and_released_on_shutdown(monkeypatch):
+    monkeypatch.setattr(redis_conn, "initialize", _use_fakeredis)
+    with TestClient(app) as client:
+        assert client.get("/health/live").json() == {"status": "alive"}
+        response = client.get("/health/ready")
+        assert response.status_code == 200
+        assert response.json() == {"status": "ready", "checks": {"database": "ok", "redis": "ok", "oauth_metadata": "ok"}}
+        assert "set-cookie" not in response.headers
+    assert redis_conn.redis_pool is None
+
+
+def test_not_ready_until_retried_warm_up_succeeds(monkeypatch):
+    # Redis is unreachable at startup: the worker serves, but is not ready
+    monkeypatch.setattr(redis_conn, "initialize", _noop)
+    with TestClient(app) as client:
+        assert client.get("/health/live").status_code == 200
+        response = client.get("/health/ready")
+        assert response.status_code == 503
+        assert response.json()["status"] == "starting"
+        assert response.json()["checks"]["redis"].startswith("error")
+
+        client.portal.call(_use_fakeredis)
+        for _ in range(100):
+            if client.get("/health/ready").status_code == 200:
+                break
+            client.portal.call(asyncio.sleep, 0.05)
+        assert client.get("/health/ready").json()["checks"]["redis"] == "ok"
+
+
+def test_database_down_at_startup_does_not_stop_the_worker(monkeypatch):
+    async def unreachable():
+        raise ConnectionRefusedError("database is down")
+
+    monkeypatch.setattr(redis_conn, "initialize", _use_fakeredis)
+    monkeypatch.setattr(lifespan, "init_db", unreachable)
+    with TestClient(app) as client:
+        response = client.get("/health/ready")
+        assert response.status_code == 503
+        assert response.json()["checks"]["database"].startswith("error")
+
+        monkeypatch.setattr(lifespan, "init_db", _noop)
+        for _ in range(100):
+            if client.get("/health/ready").status_code == 200:
+                break
+            client.portal.call(asyncio.sleep, 0.05)
+        assert client.get("/health/ready").json()["checks"]["database"] == "ok"
+
+
+def test_warm_database_fills_the_pool(monkeypatch, tmp_path):
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/warm.db", poolclass=AsyncAdaptedQueuePool, pool_size=3)
+        monkeypatch.setattr(lifespan, "async_engine", engine)
+        try:
+            assert await warm_database(10) == 3
+            return engine.sync_engine.pool.checkedin()
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(run()) == 3
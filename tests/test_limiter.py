@@ -0,0 +1,119 @@
+import asyncio
+import hashlib
+import logging
+import uuid
+import fakeredis.aioredis
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from redis.exceptions import ConnectionError as RedisConnectionError
+from src.auth.auth import create_access_token
+from src.core.config.config import settings
+from src.redis_client import redis_conn
+from src.security.limiter import Limiter
+
+
+limiter = Limiter(default="3/minute")
+app = FastAPI(dependencies=[Depends(limiter)])
+
+
+@app.get("/default")
+async def default_policy():
+    return {"ok": True}
+
+
+@app.get("/strict")
+@limiter.limit("1/minute")
+async def strict_policy():
+    return {"ok": True}
+
+
+@app.get("/open")
+@limiter.exempt
+async def no_policy():
+    return {"ok": True}
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(redis_conn, "redis_pool", fake)
+    return fake
+
+
+def test_default_limit(redis):
+    with TestClient(app) as client:
+        responses = [client.get("/default") for _ in range(4)]
+    assert [response.status_code for response in responses] == [200, 200, 200, 429]
+    assert responses[0].headers["X-RateLimit-Limit"] == "3"
+    assert responses[0].headers["X-RateLimit-Remaining"] == "2"
+    assert int(responses[-1].headers["Retry-After"]) > 0
+
+
+def test_route_policy_and_exemption(redis):
+    with TestClient(app) as client:
+        assert [client.get("/strict").status_code for _ in range(2)] == [200, 429]
+        # Route policies have their own counters
+        assert client.get("/default").status_code == 200
+        assert all(client.get("/open").status_code == 200 for _ in range(5))
+
+
+def test_counters_are_per_user(redis, monkeypatch):
+    monkeypatch.setattr(settings, "api_key_digests", [hashlib.sha256(b"key-1").hexdigest()])
+    alice = {"Authorization": f"Bearer {create_access_token({'sub': 'alice@example.com'})}"}
+    bob = {"Authorization": f"Bearer {create_access_token({'sub': 'bob@example.com'})}"}
+    with TestClient(app) as client:
+        assert client.get("/strict", headers=alice).status_code == 200
+        assert client.get("/strict", headers=alice).status_code == 429
+        assert client.get("/strict", headers=bob).status_code == 200
+        assert client.get("/strict", headers={"X-API-Key": "key-1"}).status_code == 200
+
+
+def test_limit_is_shared_between_workers(monkeypatch):
+    workers = [Limiter(default="3/minute"), Limiter(default="3/minute")]
+
+    async def run():
+        monkeypatch.setattr(redis_conn, "redis_pool", fakeredis.aioredis.FakeRedis(decode_responses=True))
+        return [(await workers[i % 2].hit("ratelimit:default:ip:1", workers[0].default))[0] for i in range(4)]
+
+    assert asyncio.run(run()) == [True, True, True, False]
+
+
+def test_falls_back_to_local_bucket_without_redis(monkeypatch):
+    monkeypatch.setattr(redis_conn, "redis_pool", None)
+    fallback = FastAPI(dependencies=[Depends(Limiter(default="2/minute"))])
+    fallback.add_api_route("/default", default_policy)
+    with TestClient(fallback) as client:
+        assert [client.get("/default").status_code for _ in range(3)] == [200, 200, 429]
+
+
+def test_unknown_api_keys_do_not_get_their_own_bucket(redis):
+    with TestClient(app) as client:
+        statuses = [client.get("/strict", headers={"X-API-Key": uuid.uuid4().hex}).status_code for _ in range(3)]
+    assert statuses == [200, 429, 429]
+
+
+def test_fallback_is_logged_once_per_outage(monkeypatch, caplog):
+    monkeypatch.setattr(redis_conn, "redis_pool", None)
+    fallback = FastAPI(dependencies=[Depends(Limiter(default="100/minute"))])
+    fallback.add_api_route("/default", default_policy)
+    with caplog.at_level(logging.WARNING), TestClient(fallback) as client:
+        for _ in range(5):
+            client.get("/default")
+    assert sum("falling back" in record.getMessage() for record in caplog.records) == 1
+
+
+def test_redis_is_not_retried_until_the_window_passes(monkeypatch):
+    calls = []
+
+    async def unreachable():
+        calls.append(1)
+        raise RedisConnectionError("connection refused")
+
+    monkeypatch.setattr(redis_conn, "get_redis", unreachable)
+    monkeypatch.setattr(settings, "rate_limit_redis_retry_seconds", 60)
+    fallback = FastAPI(dependencies=[Depends(Limiter(default="100/minute"))])
+    fallback.add_api_route("/default", default_policy)
+    with TestClient(fallback) as client:
+        assert {client.get("/default").status_code for _ in range(5)} == {200}
+    assert len(calls) == 1
@@ -0,0 +1,51 @@
+import asyncio
+from typing import Optional
+from fastapi.testclient import TestClient
+from src.api.v1 import endpoints  # registers the /users routes on the app
+from src.app import app
+from src.models.loaders import loader_options
+from src.models.models import AsyncSessionLocal, Item, User, init_db
+from src.models.pydanticModels import ItemModel, UserModel
+
+
+class ItemWithOwner(ItemModel):
+    owner: Optional[UserModel] = None
+
+
+class UserWithJoinedItems(UserModel):
+    __loader_strategies__ = {"items": "joined"}
+
+
+def test_collections_use_selectinload():
+    [option] = loader_options(User, UserModel)
+    assert "User.items" in str(option.path)
+    assert option.context[0].strategy == (("lazy", "selectin"),)
+
+
+def test_schema_can_override_strategy():
+    [option] = loader_options(User, UserWithJoinedItems)
+    assert option.context[0].strategy == (("lazy", "joined"),)
+
+
+def test_nested_schema_is_followed():
+    [option] = loader_options(Item, ItemWithOwner)
+    assert option.context[0].strategy == (("lazy", "joined"),)
+    [nested] = option.context[1:]
+    assert "User.items" in str(nested.path)
+
+
+def test_get_user_query_count_is_independent_of_items(assert_query_count):
+    async def seed():
+        await init_db()
+        async with AsyncSessionLocal() as db:
+            user = User(email="loader@example.com", hashed_password="x", items=[Item(name=f"item{i}") for i in range(5)])
+            db.add(user)
+            await db.commit()
+            return user.id
+
+    user_id = asyncio.run(seed())
+    client = TestClient(app)
+    # ETag aggregate, the user, then its items in one selectin query
+    with assert_query_count(3):
+        response = client.get(f"/users/{user_id}")
+    assert len(response.json()["items"]) == 5
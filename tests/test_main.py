@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 from fastapi.testclient import TestClient
 import sys
@@ -7,11 +8,26 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
 
 from main import app
+from src.auth.auth import get_password_hash
+from src.models.models import AsyncSessionLocal, init_db
+from src.repositories.users import UserRepository
 
 
 client = TestClient(app)
 
 
+@pytest.fixture(scope="module")
+def user1():
+    async def seed():
+        await init_db()
+        async with AsyncSessionLocal() as db:
+            users = UserRepository(db)
+            if await users.get_credentials("user1") is None:
+                await users.create("user1", get_password_hash("password1"))
+
+    asyncio.run(seed())
+
+
 def test_swagger_ui():
     response = client.get("/swagger")
     assert response.status_code == 200
@@ -51,7 +67,7 @@ def test_api_v1_endpoint():
     assert response.json() == {"item": payload}
 
 
-def test_login():
+def test_login(user1):
     response = client.post("/api/v1/login", json={
         "username": "user1",
         "password": "password1",
@@ -59,7 +75,7 @@ def test_login():
     assert response.status_code == 200
     assert "access_token" in response.json()
 
-def test_access_protected_route():
+def test_access_protected_route(user1):
     response = client.post("/api/v1/login", json={"username": "user1", "password": "password1"})
     token = response.json().get("access_token")
     headers = {"Authorization": f"Bearer {token}"}
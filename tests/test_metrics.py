@@ -0,0 +1,87 @@
+import asyncio
+import os
+import subprocess
+import sys
+import fakeredis.aioredis
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+from src.main import app as main_app
+from src.middleware.metrics import MetricsMiddleware
+from src.models.models import async_engine
+from src.redis_client import TimedRedis
+
+app = FastAPI()
+app.add_middleware(MetricsMiddleware)
+
+
+@app.get("/things/{thing_id}")
+async def get_thing(thing_id: int):
+    async with async_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        await conn.execute(text("SELECT 2"))
+    return {"id": thing_id}
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_requests_are_labelled_by_route_template():
+    client = TestClient(app)
+    route = {"method": "GET", "route": "/things/{thing_id}", "status": "200"}
+    before = sample("http_requests_total", **route)
+    unmatched = sample("http_requests_total", method="GET", route="<unmatched>", status="404")
+
+    client.get("/things/1")
+    client.get("/things/2")
+    client.get("/no/such/path")
+
+    assert sample("http_requests_total", **route) == before + 2
+    assert sample("http_requests_total", method="GET", route="<unmatched>", status="404") == unmatched + 1
+    assert sample("http_requests_in_progress", method="GET") == 0
+
+
+def test_db_queries_are_counted_per_request():
+    route = {"route": "/things/{thing_id}"}
+    queries = sample("http_request_db_queries_sum", **route)
+    requests = sample("http_request_db_queries_count", **route)
+
+    TestClient(app).get("/things/3")
+
+    assert sample("http_request_db_queries_sum", **route) == queries + 2
+    assert sample("http_request_db_queries_count", **route) == requests + 1
+    assert sample("http_request_db_duration_seconds_sum", **route) > 0
+
+
+def test_redis_commands_are_timed():
+    async def run():
+        redis = TimedRedis(connection_pool=fakeredis.aioredis.FakeRedis().connection_pool)
+        await redis.set("metrics:key", "1")
+        async with redis.pipeline() as pipe:
+            await pipe.get("metrics:key").incr("metrics:key").execute()
+
+    before = sample("redis_command_duration_seconds_count", command="SET")
+    pipelines = sample("redis_command_duration_seconds_count", command="PIPELINE")
+    asyncio.run(run())
+    assert sample("redis_command_duration_seconds_count", command="SET") == before + 1
+    assert sample("redis_command_duration_seconds_count", command="PIPELINE") == pipelines + 1
+
+
+def test_metrics_endpoint():
+    response = TestClient(main_app).get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert b"http_request_duration_seconds_bucket" in response.content
+
+
+def test_workers_are_aggregated(tmp_path):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    worker = "from src.core.prometheus import http_requests; http_requests.labels('GET', '/x', '200').inc()"
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", worker], env=env, check=True)
+
+    scrape = "from src.core.prometheus import render; print(render().decode())"
+    output = subprocess.run([sys.executable, "-c", scrape], env=env, check=True, capture_output=True, text=True).stdout
+    assert 'http_requests_total{method="GET",route="/x",status="200"} 2.0' in output
@@ -0,0 +1,93 @@
+import warnings
+from datetime import timedelta
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import delete
+from sqlalchemy.exc import SAWarning
+from src.api.v1.endpoints import router
+from src.auth.auth import create_access_token
+from src.models.models import Item, User
+
+app = FastAPI()
+app.include_router(router, prefix="/api/v1")
+client = TestClient(app)
+admin = {"Authorization": f"Bearer {create_access_token({'sub': 'admin', 'roles': ['admin']}, timedelta(minutes=5))}"}
+
+
+@pytest.fixture(scope="module")
+def owners(isolated_db):
+    isolated_db.use_on(app)
+
+    async def seed(db):
+        owners = [User(email=f"page{i}@example.com", hashed_password="x") for i in range(2)]
+        db.add_all(owners)
+        await db.flush()
+        db.add_all(Item(name=f"item{i}", owner_id=owners[i % 2].id) for i in range(7))
+        await db.commit()
+        return [owner.id for owner in owners]
+
+    return isolated_db.run(seed)
+
+
+def test_items_are_walked_with_a_cursor(owners):
+    names, after = [], None
+    while True:
+        params = {"limit": 3} if after is None else {"limit": 3, "after": after}
+        page = client.get("/api/v1/items", params=params).json()
+        names += [item["name"] for item in page["items"]]
+        after = page["next_cursor"]
+        if after is None:
+            break
+    assert names == [f"item{i}" for i in range(7)]
+
+
+def test_items_filtered_by_owner(owners):
+    page = client.get("/api/v1/items", params={"owner_id": owners[1]}).json()
+    assert [item["name"] for item in page["items"]] == ["item1", "item3", "item5"]
+    assert page["next_cursor"] is None
+
+
+def test_users_filtered_by_email(owners):
+    page = client.get("/api/v1/users", params={"email": "page0@example.com"}, headers=admin).json()
+    assert [user["id"] for user in page["items"]] == [owners[0]]
+    assert len(page["items"][0]["items"]) == 4
+
+
+def test_user_listing_requires_admin(owners):
+    assert client.get("/api/v1/users", params={"email": "page0@example.com"}).status_code == 401
+    user = {"Authorization": f"Bearer {create_access_token({'sub': 'page0@example.com'}, timedelta(minutes=5))}"}
+    assert client.get("/api/v1/users", headers=user).status_code == 403
+
+
+def test_user_page_etag_is_one_plain_query(owners):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", SAWarning)  # e.g. a cartesian product between FROM elements
+        response = client.get("/api/v1/users", headers=admin)
+    assert response.status_code == 200
+    assert client.get("/api/v1/users", headers={**admin, "If-None-Match": response.headers["ETag"]}).status_code == 304
+
+
+def test_item_page_etag_tells_apart_pages_with_equal_sums(owners, isolated_db):
+    async def replace_items(db, ids):
+        await db.execute(delete(Item).where(Item.owner_id == owner_id))
+        db.add_all(Item(id=item_id, name="same", owner_id=owner_id) for item_id in ids)
+        await db.commit()
+
+    owner_id = isolated_db.run(lambda db: _add_owner(db, "sums@example.com"))
+    etags = []
+    for ids in ((1002, 1003), (1001, 1004)):
+        isolated_db.run(lambda db: replace_items(db, ids))
+        etags.append(client.get("/api/v1/items", params={"owner_id": owner_id}).headers["ETag"])
+    assert etags[0] != etags[1]
+
+
+async def _add_owner(db, email):
+    owner = User(email=email, hashed_password="x")
+    db.add(owner)
+    await db.commit()
+    return owner.id
+
+
+def test_page_size_is_bounded(owners):
+    assert client.get("/api/v1/items", params={"limit": 10_000}).status_code == 422
@@ -0,0 +1,85 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.main import app as main_app
+from src.middleware.pipeline import Layer, SkippableLayer, install_middleware, skip_middleware
+
+
+class Recorder:
+    """Layer that notes each path it sees."""
+
+    def __init__(self, app, seen: list):
+        self.app = app
+        self.seen = seen
+
+    async def __call__(self, scope, receive, send):
+        self.seen.append(scope["path"])
+        await self.app(scope, receive, send)
+
+
+def build_app():
+    outer, inner = [], []
+    app = FastAPI()
+
+    @app.get("/plain")
+    async def plain():
+        return {}
+
+    @app.get("/health")
+    @skip_middleware("inner")
+    async def health():
+        return {}
+
+    @app.get("/things/{thing_id}")
+    @skip_middleware("outer", "inner")
+    async def thing(thing_id: int):
+        return {}
+
+    @app.post("/health")
+    async def report_health():
+        return {}
+
+    @app.get("/labels/export")
+    async def export_labels():
+        return {}
+
+    @app.get("/labels/{name}")
+    @skip_middleware("outer")
+    async def label(name: str):
+        return {}
+
+    install_middleware(app, [Layer("outer", Recorder, {"seen": outer}), Layer("inner", Recorder, {"seen": inner})])
+    return TestClient(app), outer, inner
+
+
+def test_routes_opt_out_of_named_layers():
+    client, outer, inner = build_app()
+    for path in ("/plain", "/health", "/things/1", "/docs"):
+        assert client.get(path).status_code == 200
+    assert outer == ["/plain", "/health", "/docs"]
+    assert inner == ["/plain", "/docs"]
+
+
+def test_opt_outs_follow_the_matched_route():
+    client, outer, inner = build_app()
+    # Same path, other method: GET /health's opt-out does not apply
+    assert client.post("/health").status_code == 200
+    # A static route is not covered by a decorated dynamic one that would also match its path
+    assert client.get("/labels/export").status_code == 200
+    assert client.get("/labels/mine").status_code == 200
+    assert outer == ["/health", "/labels/export"]
+    assert inner == ["/health", "/labels/export", "/labels/mine"]
+
+
+def test_main_app_pipeline_order():
+    names = [m.kwargs["name"] for m in main_app.user_middleware]
+    assert all(m.cls is SkippableLayer for m in main_app.user_middleware)
+    assert names[0] == "metrics"
+    assert names[-3:] == ["cors", "cookie_session", "session"]
+
+
+def test_metrics_skips_sessions_and_rate_limit():
+    client = TestClient(main_app)
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert "set-cookie" not in response.headers
+    assert "x-ratelimit-limit" not in response.headers
@@ -0,0 +1,100 @@
+import asyncio
+import json
+import fakeredis.aioredis
+import pytest
+from src.auth.provider_metadata import ProviderMetadataCache, cache_ttl
+from src.redis_client import redis_conn
+from stub_idp import StubIdP
+
+
+@pytest.fixture(scope="module")
+def stub():
+    return StubIdP(max_age=300)
+
+
+@pytest.fixture(autouse=True)
+def reset(stub):
+    stub.requests.clear()
+
+
+def run_with_redis(monkeypatch, scenario):
+    async def run():
+        monkeypatch.setattr(redis_conn, "redis_pool", fakeredis.aioredis.FakeRedis(decode_responses=True))
+        return await scenario()
+
+    return asyncio.run(run())
+
+
+def test_cache_ttl_from_headers():
+    assert cache_ttl({"cache-control": "public, max-age=600", "age": "100"}, default=3600) == 500
+    assert cache_ttl({"cache-control": "no-store"}, default=3600) == 60
+    assert cache_ttl({}, default=3600) == 3600
+    assert cache_ttl({"cache-control": "max-age=999999"}, default=3600) == 86400
+
+
+def test_parse_id_token_uses_cached_jwks(monkeypatch, stub):
+    oauth = stub.oauth()
+    cache = ProviderMetadataCache(oauth, stub.metadata_urls)
+
+    async def scenario():
+        await cache.get("google")
+        token = {"id_token": stub.id_token("google-client", nonce="n-1"), "access_token": "at"}
+        return await oauth.google.parse_id_token(token, nonce="n-1")
+
+    assert run_with_redis(monkeypatch, scenario)["sub"] == "stub"
+    # Fetched once at load; the callback itself made no request
+    assert stub.requests == ["/google/.well-known/openid-configuration", "/google/jwks"]
+
+
+def test_other_workers_read_from_redis(monkeypatch, stub):
+    first, second = (ProviderMetadataCache(stub.oauth(), stub.metadata_urls) for _ in range(2))
+
+    async def scenario():
+        await first.get("google")
+        metadata = await second.get("google")
+        ttl = await redis_conn.redis_pool.ttl("oauth:metadata:google")
+        return metadata, ttl
+
+    metadata, ttl = run_with_redis(monkeypatch, scenario)
+    assert metadata["jwks"]["keys"][0]["kid"] == "stub"
+    assert 300 < ttl <= 600
+    assert len(stub.requests) == 2
+
+
+def test_fetched_metadata_is_installed_once(monkeypatch, stub):
+    cache = ProviderMetadataCache(stub.oauth(), stub.metadata_urls)
+    installed = []
+    install = cache._install
+    monkeypatch.setattr(cache, "_install", lambda name, entry: installed.append(name) or install(name, entry))
+
+    run_with_redis(monkeypatch, lambda: cache.get("google"))
+    assert installed == ["google"]
+
+
+def test_pinned_file_never_fetches(monkeypatch, stub, tmp_path):
+    pinned = tmp_path / "oauth_metadata.json"
+    pinned.write_text(json.dumps({"google": {"issuer": "https://pinned.test", "jwks": {"keys": []}}}))
+    oauth = stub.oauth()
+    cache = ProviderMetadataCache(oauth, stub.metadata_urls, pinned_file=str(pinned))
+
+    async def scenario():
+        await cache.start()
+        await cache.stop()
+        return oauth.google.server_metadata
+
+    assert run_with_redis(monkeypatch, scenario)["issuer"] == "https://pinned.test"
+    assert stub.requests == []
+
+
+def test_stub_serves_github_and_facebook(stub):
+    oauth = stub.oauth()
+
+    async def scenario():
+        token = await oauth.github.fetch_access_token(code="code")
+        github = await oauth.github.get("https://idp.test/github/user", token=token)
+        facebook = await oauth.facebook.get("https://idp.test/facebook/me", token=token)
+        return github.json(), facebook.json()
+
+    github, facebook = asyncio.run(scenario())
+    assert github["login"] == "stub"
+    assert facebook["email"] == "stub@example.com"
@@ -0,0 +1,24 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from src.redis_client import RedisConnection
+
+
+def test_get_redis_before_initialize():
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(RedisConnection().get_redis())
+    assert excinfo.value.status_code == 503
+
+
+def test_initialize_is_shared_and_bounded():
+    async def scenario():
+        conn = RedisConnection()
+        await conn.initialize()
+        client = await conn.get_redis()
+        await conn.initialize()
+        assert await conn.get_redis() is client
+        assert client.connection_pool.max_connections == 50
+        await conn.close()
+        assert conn.redis_pool is None
+
+    asyncio.run(scenario())
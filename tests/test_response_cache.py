@@ -0,0 +1,148 @@
+import asyncio
+import fakeredis.aioredis
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.auth.auth import create_access_token
+from src.core.response_cache import ResponseCache, cached, response_cache
+from src.redis_client import redis_conn
+
+
+app = FastAPI()
+loads = []
+
+
+@app.get("/profiles/{profile_id}")
+@cached("profiles", tags=lambda params: [f"profile:{params['profile_id']}"])
+async def get_profile(profile_id: int):
+    loads.append(profile_id)
+    return {"id": profile_id}
+
+
+@app.get("/search")
+@cached("search", vary_on=None)
+async def search(q: str, page: int = 1):
+    loads.append(q)
+    return {"q": q, "page": page}
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(redis_conn, "redis_pool", fake)
+    return fake
+
+
+@pytest.fixture(autouse=True)
+def reset_cache():
+    loads.clear()
+    response_cache.clear()
+
+
+def test_hits_local_then_redis_tier(redis):
+    with TestClient(app) as client:
+        assert client.get("/profiles/1").json() == {"id": 1}
+        assert client.get("/profiles/1").json() == {"id": 1}
+        # Another worker only shares the Redis tier
+        response_cache.local.clear()
+        assert client.get("/profiles/1").json() == {"id": 1}
+        assert loads == [1]
+        assert client.portal.call(redis.keys, "cache:profiles:*") != []
+
+
+def test_invalidate_drops_both_tiers(redis):
+    with TestClient(app) as client:
+        client.get("/profiles/1")
+        client.get("/profiles/2")
+        client.portal.call(response_cache.invalidate, "profile:1")
+        client.get("/profiles/1")
+        client.get("/profiles/2")
+        assert loads == [1, 2, 1]
+
+
+def test_invalidation_by_another_worker_during_a_load_is_not_overwritten(monkeypatch):
+    workers = [ResponseCache(maxsize=10, ttl=60, local_ttl=60) for _ in range(2)]
+
+    async def run():
+        fake = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        monkeypatch.setattr(redis_conn, "redis_pool", fake)
+
+        async def slow_load():
+            # The row changes and the other worker invalidates while this load is in flight
+            await workers[1].invalidate("profile:1")
+            return {"version": 1}
+
+        await workers[0].get_or_load("cache:profiles:1", slow_load, tags=["profile:1"])
+        stored = await fake.get("cache:profiles:1")
+        reloaded = await workers[0].get_or_load("cache:profiles:1", load_current, tags=["profile:1"])
+        return stored, reloaded
+
+    async def load_current():
+        return {"version": 2}
+
+    assert asyncio.run(run()) == (None, {"version": 2})
+
+
+def test_query_parameters_are_part_of_the_key(redis):
+    with TestClient(app) as client:
+        assert client.get("/search", params={"q": "a"}).json() == {"q": "a", "page": 1}
+        assert client.get("/search", params={"q": "b"}).json() == {"q": "b", "page": 1}
+        assert client.get("/search", params={"q": "a", "page": 2}).json() == {"q": "a", "page": 2}
+        assert client.get("/search?page=2&q=a").json() == {"q": "a", "page": 2}
+        assert loads == ["a", "b", "a"]
+
+
+def test_entries_are_scoped_to_the_caller(redis):
+    alice = {"Authorization": f"Bearer {create_access_token({'sub': 'alice@example.com'})}"}
+    bob = {"Authorization": f"Bearer {create_access_token({'sub': 'bob@example.com'})}"}
+    with TestClient(app) as client:
+        client.get("/profiles/1", headers=alice)
+        client.get("/profiles/1", headers=alice)
+        client.get("/profiles/1", headers=bob)
+        assert loads == [1, 1]
+
+
+def test_works_without_redis(monkeypatch):
+    monkeypatch.setattr(redis_conn, "redis_pool", None)
+    with TestClient(app) as client:
+        client.get("/profiles/1")
+        client.get("/profiles/1")
+        assert loads == [1]
+
+
+def test_concurrent_misses_share_one_load(monkeypatch):
+    monkeypatch.setattr(redis_conn, "redis_pool", None)
+    cache = ResponseCache(maxsize=10, ttl=60, local_ttl=5)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"value": 1}
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_load("key", loader) for _ in range(5)))
+
+    assert asyncio.run(run()) == [{"value": 1}] * 5
+    assert calls == [1]
+    assert cache.stats()["coalesced"] == 4
+
+
+def test_forgotten_tags_still_count_as_invalidated(monkeypatch):
+    monkeypatch.setattr(redis_conn, "redis_pool", None)
+    cache = ResponseCache(maxsize=10, ttl=60, local_ttl=60, tags_size=2)
+    versions = iter(range(10))
+
+    async def load():
+        return next(versions)
+
+    async def run():
+        assert await cache.get_or_load("profile", load, tags=["profile:1"]) == 0
+        await cache.invalidate("profile:1")
+        # Pushes profile:1 out of the bounded table
+        await cache.invalidate("profile:2")
+        await cache.invalidate("profile:3")
+        assert len(cache._invalidated_at) == 2
+        return await cache.get_or_load("profile", load, tags=["profile:1"])
+
+    assert asyncio.run(run()) == 1
@@ -0,0 +1,53 @@
+from fastapi import APIRouter, FastAPI, Response
+from fastapi.testclient import TestClient
+from pydantic import BaseModel, field_validator
+from src.core.responses import ModelJSONResponse, ModelRoute
+from src.models.pydanticModels import ItemModel, UserModel
+
+
+validations = []
+
+
+class CountedModel(BaseModel):
+    value: int
+    items: list[ItemModel] = []
+
+    @field_validator("value")
+    @classmethod
+    def count(cls, value):
+        validations.append(value)
+        return value
+
+
+app = FastAPI(default_response_class=ModelJSONResponse)
+app.router.route_class = ModelRoute
+router = APIRouter(route_class=ModelRoute)
+
+
+@router.get("/model", response_model=CountedModel, status_code=201)
+async def returns_model(response: Response):
+    response.headers["X-Version"] = "1"
+    return CountedModel(value=1, items=[ItemModel(id=1, name="item", owner_id=1)])
+
+
+@router.get("/dict", response_model=UserModel)
+async def returns_dict():
+    return {"id": 1, "email": "a@example.com", "hashed_password": "secret"}
+
+
+app.include_router(router, prefix="/api")
+
+
+def test_model_is_sent_without_revalidation():
+    validations.clear()
+    response = TestClient(app).get("/api/model")
+    assert response.status_code == 201
+    assert response.headers["X-Version"] == "1"
+    assert response.json() == {"value": 1, "items": [{"id": 1, "name": "item", "owner_id": 1}]}
+    # Only the handler's own construction
+    assert validations == [1]
+
+
+def test_other_returns_are_still_filtered_by_response_model():
+    response = TestClient(app).get("/api/dict")
+    assert response.json() == {"id": 1, "email": "a@example.com", "items": []}
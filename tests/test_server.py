@@ -0,0 +1,55 @@
+import os
+import pytest
+from src.core import server
+from src.core.config.config import settings
+
+
+def test_uvicorn_options_use_fast_loop_and_parser():
+    options = server.uvicorn_options(keepalive=75, backlog=4096, graceful_timeout=20, access_log=False)
+    assert options["loop"] == "uvloop"
+    assert options["http"] == "httptools"
+    assert options["timeout_keep_alive"] == 75
+    assert options["backlog"] == 4096
+    assert options["timeout_graceful_shutdown"] == 20
+
+
+def test_default_workers_follows_cpus():
+    assert server.default_workers() >= 1
+
+
+def test_metrics_dir_is_shared_and_emptied(monkeypatch, tmp_path):
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+    monkeypatch.setattr(settings, "prometheus_multiproc_dir", None)
+    assert server.prepare_metrics_dir(workers=1) is None
+
+    (tmp_path / "counter_1.db").write_bytes(b"stale")
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    assert server.prepare_metrics_dir(workers=4) == str(tmp_path)
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.fixture
+def metrics_env(monkeypatch):
+    # setenv first, so the variable prepare_metrics_dir exports is removed again afterwards
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", "")
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR")
+
+
+def test_configured_metrics_dir_is_the_one_emptied(monkeypatch, metrics_env, tmp_path):
+    monkeypatch.setattr(settings, "prometheus_multiproc_dir", str(tmp_path))
+    (tmp_path / "counter_1.db").write_bytes(b"stale")
+    assert server.prepare_metrics_dir(workers=4) == str(tmp_path)
+    assert os.environ["PROMETHEUS_MULTIPROC_DIR"] == str(tmp_path)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_default_metrics_dir_is_unique_per_run(monkeypatch, metrics_env):
+    monkeypatch.setattr(settings, "prometheus_multiproc_dir", None)
+    directories = []
+    for _ in range(2):
+        os.environ.pop("PROMETHEUS_MULTIPROC_DIR", None)
+        directories.append(server.prepare_metrics_dir(workers=2))
+    assert directories[0] != directories[1]
+    for directory in directories:
+        server._remove_metrics_dir(directory, os.getpid())
+        assert not os.path.exists(directory)
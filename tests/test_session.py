@@ -0,0 +1,144 @@
+import time
+import fakeredis.aioredis
+import orjson
+import pytest
+from redis.client import NEVER_DECODE
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+from src.middleware.session import (
+    COMPACT_PREFIX, RedisSession, SessionStore, SessionSweeper, add_session_middleware, get_session, oauth_state_store,
+    session_store,
+)
+from src.redis_client import redis_conn
+
+
+app = FastAPI()
+add_session_middleware(app)
+
+
+@app.get("/")
+async def root():
+    return {"message": "ok"}
+
+
+@app.get("/untouched")
+async def untouched():
+    return {"message": "ok"}
+
+
+@app.get("/read")
+async def read(session: RedisSession = Depends(get_session)):
+    return dict(session)
+
+
+@app.post("/write")
+async def write(value: str, session: RedisSession = Depends(get_session)):
+    session["value"] = value
+    return dict(session)
+
+
+@app.post("/write-unloaded")
+async def write_unloaded(request: Request):
+    request.state.session["value"] = "lost"
+    return {"message": "ok"}
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(redis_conn, "redis_pool", fake)
+    return fake
+
+
+def test_exempt_and_untouched_routes_skip_redis():
+    # Without a Redis client any round trip would fail with 503
+    with TestClient(app, cookies={"session_id": "abc"}) as client:
+        assert client.get("/").status_code == 200
+        assert client.get("/untouched").status_code == 200
+
+
+def test_session_cannot_be_used_before_it_is_loaded(redis):
+    # A write here would never be saved, since the middleware persists loaded sessions only
+    with TestClient(app) as client, pytest.raises(RuntimeError, match="get_session"):
+        client.post("/write-unloaded")
+
+
+def test_session_written_only_on_change(redis):
+    with TestClient(app) as client:
+        response = client.post("/write", params={"value": "one"})
+        session_id = response.cookies["session_id"]
+        stored = client.portal.call(redis.get, f"session:{session_id}")
+        assert orjson.loads(stored) == {"value": "one"}
+        assert client.get("/read").json() == {"value": "one"}
+
+
+def test_read_refreshes_ttl_without_rewrite(redis):
+    session_id = session_store.new_id()
+    with TestClient(app, cookies={"session_id": session_id}) as client:
+        client.portal.call(redis.set, f"session:{session_id}", orjson.dumps({"value": "one"}), 10)
+        assert client.get("/read").json() == {"value": "one"}
+        assert client.portal.call(redis.ttl, f"session:{session_id}") > 10
+
+
+def test_compact_payloads_round_trip(redis):
+    store = SessionStore("session:", idle_ttl=60, compact=True)
+    with TestClient(app) as client:
+        client.portal.call(store.set, "abc", {"value": "one" * 100})
+        raw = client.portal.call(lambda: redis.execute_command("GET", "session:abc", **{NEVER_DECODE: True}))
+        assert raw.startswith(COMPACT_PREFIX) and len(raw) < 100
+        # Readable by a store configured for plain JSON too
+        assert client.portal.call(SessionStore("session:", idle_ttl=60).get, "abc") == {"value": "one" * 100}
+
+
+def test_absolute_lifetime_is_enforced(redis):
+    store = SessionStore("session:", idle_ttl=60, absolute_ttl=3600)
+    expired_id = f"abc.{int(time.time()) - 7200:x}"
+    with TestClient(app) as client:
+        client.portal.call(redis.set, f"session:{expired_id}", orjson.dumps({"value": "one"}))
+        assert client.portal.call(store.get, expired_id) is None
+
+        fresh_id = store.new_id()
+        client.portal.call(store.set, fresh_id, {"value": "one"})
+        assert 0 < client.portal.call(redis.ttl, f"session:{fresh_id}") <= 60
+
+
+def test_oauth_state_is_single_use(redis):
+    with TestClient(app) as client:
+        state_id = oauth_state_store.new_id()
+        client.portal.call(oauth_state_store.set, state_id, {"state": "s"})
+        assert client.portal.call(redis.ttl, f"oauth:state:{state_id}") > 0
+        assert client.portal.call(oauth_state_store.pop, state_id) == {"state": "s"}
+        assert client.portal.call(oauth_state_store.pop, state_id) is None
+
+
+def test_sweeper_counts_keys_and_expires_leaked_ones(redis):
+    store = SessionStore("session:", idle_ttl=60)
+    sweeper = SessionSweeper([store], interval=60)
+    with TestClient(app) as client:
+        client.portal.call(redis.set, "session:leaked", "{}")
+        client.portal.call(store.set, "kept", {"value": "one"})
+        stats = client.portal.call(sweeper.sweep)["session:"]
+        assert stats["keys"] == 2
+        assert stats["repaired"] == 1
+        assert client.portal.call(redis.ttl, "session:leaked") == 60
+
+
+def test_one_process_sweeps_per_interval(redis):
+    store = SessionStore("session:", idle_ttl=60)
+    workers = [SessionSweeper([store], interval=60), SessionSweeper([store], interval=60)]
+    with TestClient(app) as client:
+        client.portal.call(store.set, "kept", {"value": "one"})
+        assert [client.portal.call(worker.sweep_if_due) for worker in workers] == [True, False]
+        assert workers[0].stats["session:"]["keys"] == 1
+        assert workers[1].stats == {}
+
+
+def test_legacy_session_id_is_reissued_with_timestamp(redis):
+    with TestClient(app, cookies={"session_id": "legacy"}) as client:
+        client.portal.call(redis.set, "session:legacy", orjson.dumps({"value": "one"}), 600)
+        response = client.get("/read")
+        assert response.json() == {"value": "one"}
+        new_id = response.cookies["session_id"]
+        assert new_id != "legacy" and "." in new_id
+        assert client.portal.call(redis.exists, "session:legacy") == 0
+        assert orjson.loads(client.portal.call(redis.get, f"session:{new_id}")) == {"value": "one"}
@@ -0,0 +1,107 @@
+import asyncio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from opentelemetry.instrumentation.asgi import OpenTelemetryMiddleware
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from src.core import telemetry
+from src.core.config.config import settings
+
+
+def traced_app(monkeypatch, ratio, slow_ms):
+    monkeypatch.setattr(settings, "otel_sample_ratio", ratio)
+    monkeypatch.setattr(settings, "otel_slow_request_ms", slow_ms)
+    exporter = InMemorySpanExporter()
+    app = FastAPI()
+
+    @app.get("/fast")
+    async def fast():
+        return {"ok": True}
+
+    @app.get("/slow")
+    async def slow():
+        await asyncio.sleep(0.05)
+        return {"ok": True}
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    @app.get("/things/{thing_id}")
+    async def thing(thing_id: int):
+        return {"ok": True}
+
+    # The layer src.middleware.pipeline installs
+    provider = telemetry.build_tracer_provider(exporter, batch=False)
+    app.add_middleware(OpenTelemetryMiddleware, **telemetry.tracing_middleware_options(provider))
+    return TestClient(app, raise_server_exceptions=False), exporter
+
+
+def roots(exporter):
+    return [span for span in exporter.get_finished_spans() if span.parent is None]
+
+
+def test_ratio_zero_drops_fast_requests(monkeypatch):
+    client, exporter = traced_app(monkeypatch, ratio=0.0, slow_ms=None)
+    client.get("/fast")
+    client.get("/slow")
+    assert exporter.get_finished_spans() == ()
+
+
+def test_ratio_one_keeps_everything(monkeypatch):
+    client, exporter = traced_app(monkeypatch, ratio=1.0, slow_ms=20)
+    client.get("/fast")
+    assert [span.name for span in roots(exporter)] == ["GET /fast"]
+    assert "sampling.reason" not in roots(exporter)[0].attributes
+
+
+def test_spans_are_named_after_the_route_template(monkeypatch):
+    client, exporter = traced_app(monkeypatch, ratio=1.0, slow_ms=None)
+    client.get("/things/7")
+    client.get("/nowhere")
+    assert [span.name for span in roots(exporter)] == ["GET /things/{thing_id}", "GET"]
+    assert roots(exporter)[0].attributes["http.route"] == "/things/{thing_id}"
+
+
+def test_slow_and_failed_requests_are_tail_sampled(monkeypatch):
+    client, exporter = traced_app(monkeypatch, ratio=0.0, slow_ms=20)
+    client.get("/fast")
+    client.get("/slow")
+    client.get("/boom")
+
+    kept = {span.name: span.attributes["sampling.reason"] for span in roots(exporter)}
+    assert kept == {"GET /slow": "slow", "GET /boom": "error"}
+    # The whole trace is exported, not just its root
+    slow_trace = roots(exporter)[0].context.trace_id
+    assert len([s for s in exporter.get_finished_spans() if s.context.trace_id == slow_trace]) > 1
+
+
+@pytest.mark.parametrize("flags, exported", [("01", 1), ("00", 0)])
+def test_upstream_sampling_decision_is_honoured(monkeypatch, flags, exported):
+    client, exporter = traced_app(monkeypatch, ratio=0.0, slow_ms=20)
+    client.get("/slow", headers={"traceparent": f"00-{'a' * 32}-{'b' * 16}-{flags}"})
+    assert len({span.context.trace_id for span in exporter.get_finished_spans()}) == exported
+
+
+def test_exporter_choice(monkeypatch):
+    assert isinstance(telemetry.build_exporter("memory"), InMemorySpanExporter)
+    with pytest.raises(ValueError):
+        telemetry.build_exporter("zipkin")
+
+    monkeypatch.setattr(settings, "otel_exporter", "none")
+    assert telemetry.configure_telemetry() is None
+
+
+def test_sentry_rates_come_from_settings(monkeypatch):
+    calls = []
+    monkeypatch.setattr(telemetry.sentry_sdk, "init", lambda **kwargs: calls.append(kwargs))
+    monkeypatch.setattr(settings, "sentry_dsn", "https://key@sentry.test/1")
+    monkeypatch.setattr(settings, "sentry_traces_sample_rate", 0.25)
+    monkeypatch.setattr(settings, "sentry_profiles_sample_rate", 0.0)
+    telemetry.init_sentry()
+    assert calls[0]["traces_sample_rate"] == 0.25
+    assert calls[0]["profiles_sample_rate"] == 0.0
+
+    monkeypatch.setattr(settings, "sentry_dsn", None)
+    telemetry.init_sentry()
+    assert len(calls) == 1
@@ -0,0 +1,55 @@
+import inspect
+from datetime import timedelta
+import pytest
+from jose import JWTError
+from src.auth import token_cache as token_cache_module
+from src.auth.auth import create_access_token
+from src.auth.token_cache import TokenCache
+from src.middleware.role import current_user, require_role
+
+
+def test_repeated_token_is_served_from_cache():
+    cache = TokenCache(maxsize=10, ttl=300)
+    token = create_access_token({"sub": "user1", "roles": ["admin"]}, timedelta(minutes=5))
+    assert cache.decode(token)["roles"] == ["admin"]
+    assert cache.decode(token)["sub"] == "user1"
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 1}
+
+
+def test_cached_token_is_verified_again_after_exp(monkeypatch):
+    cache = TokenCache(maxsize=10, ttl=300)
+    token = create_access_token({"sub": "user1"}, timedelta(minutes=1))
+    claims = cache.decode(token)
+
+    monkeypatch.setattr(token_cache_module.time, "time", lambda: claims["exp"] + 1)
+    cache.decode(token)
+    assert cache.stats()["misses"] == 2
+
+
+def test_expired_token_is_rejected():
+    cache = TokenCache(maxsize=10, ttl=300)
+    token = create_access_token({"sub": "user1"}, timedelta(minutes=-1))
+    with pytest.raises(JWTError):
+        cache.decode(token)
+
+
+def test_invalid_token_is_not_cached():
+    cache = TokenCache(maxsize=10, ttl=300)
+    with pytest.raises(JWTError):
+        cache.decode("not-a-token")
+    assert cache.stats()["size"] == 0
+
+
+def test_least_recently_used_token_is_evicted():
+    cache = TokenCache(maxsize=2, ttl=300)
+    tokens = [create_access_token({"sub": f"user{i}"}, timedelta(minutes=5)) for i in range(3)]
+    for token in tokens:
+        cache.decode(token)
+    cache.decode(tokens[0])
+    assert cache.stats() == {"size": 2, "hits": 0, "misses": 4}
+
+
+def test_auth_dependencies_run_on_the_event_loop():
+    # Plain def dependencies would run in the threadpool and share the unlocked LRU across threads
+    assert inspect.iscoroutinefunction(current_user)
+    assert inspect.iscoroutinefunction(require_role("admin"))
@@ -0,0 +1,59 @@
+import asyncio
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+from src.auth.auth import get_password_hash
+from src.models.models import Base, Role
+from src.repositories.users import UserRepository, local_user_cache
+
+
+def run_with_repository(scenario):
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        statements = []
+        event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        local_user_cache.clear()
+        async with async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as db:
+            await scenario(UserRepository(db), statements)
+        await engine.dispose()
+
+    asyncio.run(run())
+
+
+def test_authenticate_loads_roles_in_one_query():
+    async def scenario(users, statements):
+        await users.create("admin@example.com", get_password_hash("secret"), roles=[Role(name="admin"), Role(name="user")])
+        statements.clear()
+
+        user = await users.authenticate("admin@example.com", "secret")
+        assert sorted(user.roles) == ["admin", "user"]
+        assert len(statements) == 1
+
+    run_with_repository(scenario)
+
+
+def test_wrong_password_or_unknown_user():
+    async def scenario(users, statements):
+        await users.create("user@example.com", get_password_hash("secret"))
+        assert await users.authenticate("user@example.com", "wrong") is None
+        assert await users.authenticate("missing@example.com", "secret") is None
+
+    run_with_repository(scenario)
+
+
+def test_cached_lookup_skips_database_until_invalidated():
+    async def scenario(users, statements):
+        await users.create("user@example.com", "hash")
+        await users.get_credentials("user@example.com")
+        statements.clear()
+
+        assert (await users.get_credentials("user@example.com")).email == "user@example.com"
+        assert statements == []
+
+        await users.invalidate("user@example.com")
+        await users.get_credentials("user@example.com")
+        assert len(statements) == 1
+
+    run_with_repository(scenario)